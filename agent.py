@@ -1,35 +1,264 @@
+import asyncio
+import hashlib
 import logging
 import time
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import ClassVar, Iterator, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field, replace
 import datetime
 
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from vector_store import VectorStore
 from reranker import SimpleReranker
+from cache import SemanticCache, TTLCache
+from dates import parse_naive_datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Separators reused by the formatter and CLI output
+_HEAVY_RULE = "=" * 120
+_SECTION_RULE = "-" * 60
+_RESULT_RULE = "-" * 80
+
+# One block per result in the tool output, filled with str.format; kept plain since
+# every character here is a prompt token for the model
+_RESULT_TEMPLATE = (
+    "RESULT #{i} | Cohere Relevance: {score:.4f}\n"
+    "Title: {title}\n"
+    "Source: {source}\n"
+    "Published: {published}\n"
+    "URL: {url}\n"
+    "Content: {content}...\n"
+    + "-" * 40 + "\n"
+)
+
+# One block per result in the CLI listing
+_DISPLAY_TEMPLATE = (
+    "\n🎯 **RESULT #{i}** - Cohere Score: {score:.4f}\n"
+    "📰 **Title:** {title}\n"
+    "🏢 **Source:** {source}\n"
+    "📅 **Date:** {date}\n"
+    "🔗 **URL:** {url}\n"
+    "📝 **Content:** {content}...\n"
+    "🧠 **Ranking Reasoning:** High semantic relevance to query (Cohere AI)\n"
+    + _RESULT_RULE + "\n"
+)
+
+# Static analysis outline; it lives in the system instructions so the prompt prefix is
+# identical across queries and eligible for OpenAI prompt caching
+_ANALYSIS_OUTLINE = """\
+Provide a comprehensive, well-structured market intelligence analysis using proper markdown formatting:
+
+### 🔍 **DETAILED REASONING:**
+
+#### Key Themes and Trends:
+- Analyze ALL results comprehensively
+- Identify major themes, sentiment patterns, and market trends
+- Group findings by significance and relevance
+- Assess temporal patterns and emerging developments
+- Highlight consensus vs conflicting information
+
+#### Market Sentiment Analysis:
+- Overall sentiment (bullish/bearish/neutral) with confidence level
+- Key sentiment drivers and their impact
+- Community perception and influencer opinions
+- Risk factors and concerns identified
+
+#### Strategic Implications:
+- What this means for HyperLiquid users and investors
+- Actionable insights and recommendations
+- Potential opportunities and threats
+- Market positioning and competitive landscape
+
+### 📊 **QUANTITATIVE INSIGHTS:**
+
+#### Key Metrics and Data Points:
+- Extract specific numbers, percentages, and financial data
+- Trading volumes, TVL changes, price movements
+- User activity and adoption metrics
+- Performance comparisons and benchmarks
+
+#### Confidence Assessment:
+- **High Confidence** findings (supported by multiple credible sources)
+- **Medium Confidence** findings (limited but credible evidence)
+- **Low Confidence** findings (requires further verification)
+
+### 🔗 **SOURCE ATTRIBUTION:**
+
+#### Primary Evidence (Quote key sources):
+- Direct quotes from top 5-8 most relevant results
+- Include source name, date, and result number
+- Highlight credibility and authority of sources
+- Note any potential bias or limitations
+
+#### Supporting Evidence:
+- Additional corroborating information from other results
+- Cross-references and validation from multiple sources
+- Timeline of events and developments
+
+### 💡 **EXECUTIVE SUMMARY:**
+
+#### Key Takeaways:
+1. Most important finding with confidence level
+2. Secondary insights and implications  
+3. Risk factors and considerations
+4. Recommended actions or monitoring points
+
+**Overall Assessment:** Provide a clear, actionable conclusion with confidence rating (1-10).
+
+---
+
+**Analysis Requirements:**
+- Use proper markdown headers (###, ####) for structure
+- Include bullet points and numbered lists for clarity
+- Bold important terms and findings
+- Reference specific result numbers (Result #1, #2, etc.)
+- Provide quantitative confidence levels where possible
+- Include specific URLs for key claims
+- Structure for easy frontend parsing and display
+"""
+
+# Characters of result text given to the model; reranking already judged relevance on the full text
+_PROMPT_CONTENT_CHARS = 250
+
+# Trigger substrings for related-query expansion, matched in one scan ('hyperliquid' listed first wins)
+_RELATED_TRIGGER_RE = re.compile(r'hyperliquid|hype|token|price|trading|risk|saying|mention|opinion')
+
+# Rewrites for 'risk' queries and the most related queries ever searched alongside the base query
+_RISK_ALTERNATIVES = ('concerns', 'warning')
+_MAX_RELATED_QUERIES = 3
+
+@lru_cache(maxsize=256)
+def _related_queries(original_query: str) -> Tuple[str, ...]:
+    """Generate related search queries (memoized, queries repeat heavily)"""
+    triggers = set(_RELATED_TRIGGER_RE.findall(original_query.lower()))
+    if 'hyperliquid' in triggers:
+        triggers.add('hype')  # 'hype' is a substring of 'hyperliquid'
+    related = []
+    
+    # Add HyperLiquid variations
+    if 'hyperliquid' not in triggers:
+        related.append(f"HyperLiquid {original_query}")
+    
+    # Add HYPE token variations
+    if 'hype' not in triggers and not triggers.isdisjoint(('token', 'price', 'trading')):
+        related.append(original_query.replace('HyperLiquid', 'HYPE token'))
+    
+    # Add risk-related variations
+    if 'risk' in triggers:
+        related.extend(original_query.replace('risk', alternative) for alternative in _RISK_ALTERNATIVES)
+    
+    # Add sentiment variations
+    if not triggers.isdisjoint(('saying', 'mention', 'opinion')):
+        related.append(f"{original_query} sentiment analysis")
+    
+    # Drop rewrites that came out identical to the base query or to each other, since
+    # they would only repeat a search (compared the way VectorStore keys its search cache)
+    seen = {" ".join(original_query.lower().split())}
+    unique = []
+    for related_query in related:
+        normalized = " ".join(related_query.lower().split())
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(related_query)
+            if len(unique) == _MAX_RELATED_QUERIES:
+                break
+    
+    return tuple(unique)
+
+@lru_cache(maxsize=1)
+def _shared_vector_store() -> VectorStore:
+    """Single TurboPuffer/OpenAI-backed store reused by every agent"""
+    return VectorStore()
+
+@lru_cache(maxsize=1)
+def _shared_reranker() -> SimpleReranker:
+    """Single Cohere reranker reused by every agent"""
+    return SimpleReranker()
+
+@lru_cache(maxsize=4)
+def _shared_model(model_id: str, temperature: float, max_tokens: int) -> OpenAIChat:
+    """OpenAI chat model per settings, so agents with the same settings share one HTTP client"""
+    return OpenAIChat(id=model_id, temperature=temperature, max_tokens=max_tokens)
+
+@dataclass
+class SearchOutcome:
+    """Everything one run of the search pipeline produced"""
+    query: str
+    results: List[Dict[str, Any]]
+    base_count: int = 0
+    related: List[Tuple[str, Optional[int]]] = field(default_factory=list)
+    unique_count: int = 0
+    # Set when the base search came back empty or Cohere was unavailable; such outcomes are never cached
+    degraded: bool = False
+    
+    def copy(self) -> "SearchOutcome":
+        """Copy with fresh result rows, so callers can annotate them without touching a cached outcome"""
+        return replace(
+            self,
+            results=[{**r, 'metadata': dict(r.get('metadata', {}))} for r in self.results],
+            related=list(self.related),
+        )
+
 class HyperLiquidAgent(Agent):
     """Queryable HyperLiquid market analysis agent"""
     
+    # Built once per process; agents only receive a list copy
+    _INSTRUCTIONS: ClassVar[Tuple[str, ...]] = (
+        "You are a HyperLiquid market analysis expert with deep knowledge of DeFi, trading, and market dynamics.",
+        "Analyze ALL search results comprehensively and structure your response for clear frontend display.",
+        "Use proper markdown formatting with headers, bullet points, and emphasis for better readability.",
+        "Provide detailed reasoning with specific evidence and source attributions.",
+        "Include quantitative metrics, sentiment analysis, and actionable insights.",
+        "Structure your analysis with clear sections for easy frontend parsing.",
+        "Reference specific result numbers and include confidence levels for major findings.",
+        "Focus on market trends, sentiment patterns, and strategic implications.",
+        _ANALYSIS_OUTLINE
+    )
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize agent with vector store and reranker"""
         self.config = config or {}
         
-        # Initialize components
-        self.vector_store = VectorStore()
-        self.reranker = SimpleReranker()
+        # Initialize components (shared across agents built with different configs)
+        self.vector_store = _shared_vector_store()
+        self.reranker = _shared_reranker()
+        
+        # Shared pool for fanning out vector searches (base + 3 related queries)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.config.get('search_threads', 4),
+            thread_name_prefix="hyperliquid-search"
+        )
+        
+        # Short-lived cache of pipeline outcomes keyed on (query, top_k)
+        self._search_cache = TTLCache(
+            max_items=self.config.get('search_cache_size', 1024),
+            ttl_sec=self.config.get('search_cache_ttl', 60)
+        )
+        
+        # Final analyses keyed on normalized query, with an embedding match for near-duplicates;
+        # each entry records the result IDs it was written from
+        self._response_cache = SemanticCache(
+            embed=self.vector_store._embed_query,
+            max_items=self.config.get('response_cache_size', 256),
+            ttl_sec=self.config.get('response_cache_ttl', 3600),
+            threshold=self.config.get('semantic_cache_threshold', 0.95)
+        )
         
         # Configure agent
         super().__init__(
-            model=OpenAIChat(
-                id=self.config.get('model_id', "gpt-4o"),
-                temperature=self.config.get('temperature', 0.1),
-                max_tokens=self.config.get('max_tokens', 8000)  # Increased for comprehensive responses
+            model=_shared_model(
+                self.config.get('model_id', "gpt-4o"),
+                self.config.get('temperature', 0.1),
+                self.config.get('max_tokens', 8000)  # Increased for comprehensive responses
             ),
             tools=[self.search_mentions],
             instructions=self._get_instructions(),
@@ -39,322 +268,404 @@ class HyperLiquidAgent(Agent):
     
     def _get_instructions(self) -> List[str]:
         """Get enhanced agent instructions for better frontend display"""
-        return [
-            "You are a HyperLiquid market analysis expert with deep knowledge of DeFi, trading, and market dynamics.",
-            "Always search for information before answering queries to provide factual, data-driven insights.",
-            "Analyze ALL search results comprehensively and structure your response for clear frontend display.",
-            "Use proper markdown formatting with headers, bullet points, and emphasis for better readability.",
-            "Provide detailed reasoning with specific evidence and source attributions.",
-            "Include quantitative metrics, sentiment analysis, and actionable insights.",
-            "Structure your analysis with clear sections for easy frontend parsing.",
-            "Reference specific result numbers and include confidence levels for major findings.",
-            "Focus on market trends, sentiment patterns, and strategic implications."
-        ]
+        return list(self._INSTRUCTIONS)
     
     def search_mentions(self, query: str, top_k: int = 15) -> str:
-        """Search TurboPuffer and return ALL reranked results"""
+        """Search TurboPuffer and return ALL reranked results as a JSON list of {i, score, title, src, date, url, text}"""
         try:
-            logger.info(f"🔍 Starting TurboPuffer search for: '{query}'")
-            
-            # Perform base search
-            base_results = self.vector_store.search(query, top_k=top_k)
-            logger.info(f"📊 TurboPuffer base search: {len(base_results)} results")
-            
-            # Generate related queries for broader coverage
-            related_queries = self._generate_related_queries(query)
-            all_results = base_results.copy()
-            
-            for i, related_query in enumerate(related_queries[:3], 1):
-                try:
-                    related_results = self.vector_store.search(related_query, top_k=10)
-                    all_results.extend(related_results)
-                    logger.info(f"🔄 Related query {i}: '{related_query}' -> +{len(related_results)} results")
-                except Exception as e:
-                    logger.warning(f"❌ Related query {i} failed: {e}")
-                    continue
-            
-            # Deduplicate and rerank with Cohere
-            unique_results = self._deduplicate_results(all_results)
-            logger.info(f"🔧 After deduplication: {len(unique_results)} unique results")
-            
-            reranked_results = self.reranker.rerank(query, unique_results, top_k=top_k)
-            logger.info(f"📈 Cohere reranking complete: {len(reranked_results)} final results")
-            
-            # Format ALL results for agent analysis
-            return self._format_comprehensive_results(query, reranked_results)
-            
+            return self._results_to_json(query, self.collect_mentions(query, top_k).results)
         except Exception as e:
             logger.error(f"❌ Search failed: {e}")
             return f"Search failed: {str(e)}"
     
-    def _generate_related_queries(self, original_query: str) -> List[str]:
-        """Generate related search queries"""
-        query_lower = original_query.lower()
-        related = []
+    def collect_mentions(self, query: str, top_k: int = 15) -> SearchOutcome:
+        """Run the search pipeline once, returning the reranked rows and per-step counts"""
+        cache_key = (" ".join(query.lower().split()), top_k)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ Search cache hit for: '{query}'")
+            return cached.copy()
         
-        # Add HyperLiquid variations
-        if 'hyperliquid' not in query_lower:
-            related.append(f"HyperLiquid {original_query}")
+        logger.info(f"🔍 Starting TurboPuffer search for: '{query}'")
         
-        # Add HYPE token variations
-        if 'hype' not in query_lower and any(term in query_lower for term in ['token', 'price', 'trading']):
-            related.append(original_query.replace('HyperLiquid', 'HYPE token'))
+        # Generate related queries for broader coverage
+        related_queries = self._generate_related_queries(query)
         
-        # Add risk-related variations
-        if 'risk' in query_lower:
-            related.append(original_query.replace('risk', 'concerns'))
-            related.append(original_query.replace('risk', 'warning'))
+        # Embed every query in one OpenAI call, then issue the ANN searches concurrently
+        self.vector_store._embed_queries([query, *related_queries])
+        base_future = self._pool.submit(self.vector_store.search, query, top_k)
+        related_futures = [self._pool.submit(self.vector_store.search, q, 10) for q in related_queries]
         
-        # Add sentiment variations
-        if any(term in query_lower for term in ['saying', 'mention', 'opinion']):
-            related.append(f"{original_query} sentiment analysis")
-            
-        return related
+        # Results are deduplicated as they are merged, keeping the best-scoring copy of each
+        merged_results: Dict[Any, Dict[str, Any]] = {}
+        
+        base_results = base_future.result()
+        self._merge_results(merged_results, base_results)
+        logger.info(f"📊 TurboPuffer base search: {len(base_results)} results")
+        
+        related: List[Tuple[str, Optional[int]]] = []
+        for i, (related_query, future) in enumerate(zip(related_queries, related_futures), 1):
+            try:
+                related_results = future.result()
+                self._merge_results(merged_results, related_results)
+                related.append((related_query, len(related_results)))
+                logger.info(f"🔄 Related query {i}: '{related_query}' -> +{len(related_results)} results")
+            except Exception as e:
+                related.append((related_query, None))
+                logger.warning(f"❌ Related query {i} failed: {e}")
+        
+        # Rerank the unique results with Cohere
+        unique_results = list(merged_results.values())
+        logger.info(f"🔧 After deduplication: {len(unique_results)} unique results")
+        
+        # Cohere cost and latency grow with document count, so only send the strongest
+        # vector matches (stable sort keeps merge order for rows without a score)
+        max_candidates = max(top_k, self.config.get('rerank_candidates', 25))
+        if len(unique_results) > max_candidates:
+            unique_results.sort(key=lambda r: r.get('score', 0.0), reverse=True)
+            candidates = unique_results[:max_candidates]
+        else:
+            candidates = unique_results
+        
+        reranked_results = self.reranker.rerank(query, candidates, top_k=top_k)
+        logger.info(f"📈 Cohere reranking complete: {len(reranked_results)} final results")
+        
+        outcome = SearchOutcome(
+            query=query,
+            results=reranked_results,
+            base_count=len(base_results),
+            related=related,
+            unique_count=len(unique_results),
+            degraded=not base_results or any(r.get('rerank_fallback') for r in reranked_results),
+        )
+        # An empty search or a recency fallback may only reflect a backend outage, so retry next time
+        if not outcome.degraded:
+            self._search_cache.set(cache_key, outcome.copy())
+        return outcome
     
-    def _deduplicate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate results based on URL"""
-        seen_urls = set()
-        unique_results = []
+    def search_mentions_json(self, query: str, top_k: int = 15) -> List[Dict[str, Any]]:
+        """Search and return the reranked results as a list of dicts, skipping all text rendering"""
+        return self._result_rows(self.collect_mentions(query, top_k).results)
+    
+    def stream_analysis(self, query: str, results: List[Dict[str, Any]]) -> Iterator[str]:
+        """Stream the model's analysis of reranked results, caching the full text for repeat queries"""
+        # Give the model the reranked results directly; the analysis agent has no search tool
+        formatted_results = self._format_comprehensive_results(query, results)
+        enhanced_query = (
+            f'Based on the {len(results)} TurboPuffer search results for query: "{query}"\n'
+            "The search results are included below; analyze them directly without searching again, "
+            "following the analysis outline in your instructions.\n\n"
+            f"{formatted_results}"
+        )
         
+        chunks = []
+        for chunk in self._analysis_agent().run(enhanced_query, stream=True):
+            content = getattr(chunk, 'content', None)
+            if isinstance(content, str) and content:
+                chunks.append(content)
+                yield content
+        
+        analysis = "".join(chunks)
+        if analysis:
+            self._response_cache.put(query, (self._analysis_key(results), analysis))
+    
+    def _analysis_agent(self) -> Agent:
+        """Fresh tool-less agent for one analysis, so concurrent runs never share run state or history"""
+        return Agent(
+            model=self.model,
+            instructions=self._get_instructions(),
+            show_tool_calls=False,
+            markdown=True,
+        )
+    
+    def get_cached_analysis(self, query: str, results: List[Dict[str, Any]]) -> Optional[str]:
+        """Return a cached analysis for this query (or a near-identical one) written from these exact results"""
+        cached = self._response_cache.get(query)
+        if cached is None:
+            return None
+        
+        # The analysis cites results by number, so it only applies to the same results in the same order
+        result_key, analysis = cached
+        return analysis if result_key == self._analysis_key(results) else None
+    
+    def _analysis_key(self, results: List[Dict[str, Any]]) -> Tuple[Any, ...]:
+        """Identify a ranked result list by its result IDs (or URLs) in order"""
+        return tuple(r.get('id') or r.get('metadata', {}).get('url') for r in results)
+    
+    def search_with_analysis(self, query: str, top_k: int = 15) -> Tuple[SearchOutcome, str]:
+        """Run the search pipeline and return its outcome with the model's analysis"""
+        outcome = self.collect_mentions(query, top_k)
+        if not outcome.results:
+            return outcome, ""
+        
+        analysis = self.get_cached_analysis(query, outcome.results)
+        if analysis is None:
+            analysis = "".join(self.stream_analysis(query, outcome.results))
+        return outcome, analysis
+    
+    async def asearch_mentions(self, query: str, top_k: int = 15) -> str:
+        """Async variant of search_mentions that keeps the event loop free"""
+        # The default executor is used because search_mentions itself fans out on self._pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.search_mentions, query, top_k))
+    
+    async def acollect_mentions(self, query: str, top_k: int = 15) -> SearchOutcome:
+        """Async variant of collect_mentions that keeps the event loop free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.collect_mentions, query, top_k))
+    
+    async def search_mentions_batch(self, queries: List[str], top_k: int = 15) -> List[SearchOutcome]:
+        """Run several searches concurrently, each fanning out its related queries on the pool"""
+        # Embed every base query in one call up front; the searches then hit the embedding cache
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.vector_store._embed_queries, queries)
+        return list(await asyncio.gather(*(self.acollect_mentions(query, top_k) for query in queries)))
+    
+    def invalidate_caches(self) -> None:
+        """Drop every cached search, rerank and analysis, e.g. after new data is ingested"""
+        self._search_cache.clear()
+        self._response_cache.clear()
+        self.vector_store.clear_search_cache()
+        self.reranker.clear_cache()
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit, miss and eviction counters for each cache on the query path"""
+        return {
+            'search_outcomes': self._search_cache.stats(),
+            'responses': self._response_cache.stats(),
+            **self.vector_store.cache_stats(),
+            **self.reranker.cache_stats(),
+        }
+    
+    def _generate_related_queries(self, original_query: str) -> List[str]:
+        """Generate related search queries"""
+        return list(_related_queries(original_query))
+    
+    
+    def _merge_results(self, merged: Dict[Any, Dict[str, Any]], results: List[Dict[str, Any]]) -> None:
+        """Merge results into a dict keyed on URL (or ID, or a content hash), keeping the best-scoring copy"""
         for result in results:
-            url = result.get('metadata', {}).get('url')
-            if url and url in seen_urls:
-                continue
-            if url:
-                seen_urls.add(url)
-            unique_results.append(result)
+            key = (
+                result.get('metadata', {}).get('url')
+                or result.get('id')
+                or hashlib.blake2b(result.get('text', '')[:256].encode(), digest_size=8).digest()
+            )
+            existing = merged.get(key)
+            if existing is None or result.get('score', 0.0) > existing.get('score', 0.0):
+                merged[key] = result
+    
+    def _results_to_json(self, query: str, results: List[Dict[str, Any]]) -> str:
+        """Serialize reranked results as compact JSON for the search tool's reply"""
+        if not results:
+            return f"No relevant results found for: {query}"
         
-        return unique_results
+        return json.dumps(self._result_rows(results), ensure_ascii=False, separators=(',', ':'), default=str)
+    
+    def _result_rows(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reduce reranked results to the compact {i, score, title, src, date, url, text} rows"""
+        rows = []
+        for i, result in enumerate(results, 1):
+            metadata = result.get('metadata', {})
+            published_at = metadata.get('published_at') or ''
+            rows.append({
+                'i': i,
+                'score': round(result.get('cohere_score', 0), 4),
+                'title': metadata.get('title'),
+                'src': metadata.get('source_entity_name'),
+                'date': str(published_at)[:10],
+                'url': metadata.get('url'),
+                'text': result.get('text', '')[:_PROMPT_CONTENT_CHARS],
+            })
+        
+        return rows
     
     def _format_comprehensive_results(self, query: str, results: List[Dict[str, Any]]) -> str:
         """Format ALL search results for comprehensive agent analysis"""
         if not results:
             return f"No relevant results found for: {query}"
         
-        formatted = f"COMPREHENSIVE TURBOPUFFER SEARCH RESULTS\n"
-        formatted += f"Query: {query}\n"
-        formatted += f"Total Reranked Results: {len(results)}\n"
-        formatted += f"Data Source: TurboPuffer + Cohere Reranking\n"
-        formatted += "=" * 120 + "\n\n"
+        parts = [
+            "COMPREHENSIVE TURBOPUFFER SEARCH RESULTS\n",
+            f"Query: {query}\n",
+            f"Total Reranked Results: {len(results)}\n",
+            "\n",
+        ]
+        
+        total = len(results)
+        now = datetime.datetime.now()
+        append = parts.append
+        
+        # Summary figures are accumulated in the same pass that formats each result
+        score_sum = 0.0
+        sources = set()
+        oldest = newest = None
         
         for i, result in enumerate(results, 1):
-            metadata = result.get('metadata', {})
-            content = result.get('text', '')[:600]  # More content for analysis
-            cohere_score = result.get('cohere_score', 0)
+            get = result.get
+            meta_get = get('metadata', {}).get
+            cohere_score = get('cohere_score', 0)
+            source = meta_get('source_entity_name', 'Unknown')
+            date_str = meta_get('published_at', '')
+            
+            score_sum += cohere_score
+            sources.add(source)
+            
+            pub_date = parse_naive_datetime(date_str)
             
-            # Extract key metadata
-            title = metadata.get('title', 'No title')
-            source = metadata.get('source_entity_name', 'Unknown')
-            date_str = metadata.get('published_at', '')
-            url = metadata.get('url', 'No URL')
+            if pub_date is not None:
+                if oldest is None or pub_date < oldest:
+                    oldest = pub_date
+                if newest is None or pub_date > newest:
+                    newest = pub_date
+                published = self._render_pub_date(pub_date, now)
+            else:
+                published = self._format_date(date_str, now)
             
-            formatted += f"📊 **RESULT #{i}** | Cohere Relevance: {cohere_score:.4f}\n"
-            formatted += f"📰 Title: {title}\n"
-            formatted += f"🏢 Source: {source}\n"
-            formatted += f"📅 Published: {self._format_date(date_str)}\n"
-            formatted += f"🔗 URL: {url}\n"
-            formatted += f"📝 Content Extract: {content}...\n"
-            formatted += f"🎯 Ranking Position: #{i} of {len(results)}\n"
-            formatted += "-" * 100 + "\n\n"
+            append(_RESULT_TEMPLATE.format(
+                i=i,
+                score=cohere_score,
+                title=meta_get('title', 'No title'),
+                source=source,
+                published=published,
+                url=meta_get('url', 'No URL'),
+                content=get('text', '')[:_PROMPT_CONTENT_CHARS],
+            ))
         
         # Add search summary
-        formatted += f"SEARCH METADATA:\n"
-        formatted += f"- Average Relevance Score: {sum(r.get('cohere_score', 0) for r in results) / len(results):.4f}\n"
-        formatted += f"- Date Range: {self._get_date_range(results)}\n"
-        formatted += f"- Unique Sources: {len(set(r.get('metadata', {}).get('source_entity_name', 'Unknown') for r in results))}\n"
-        formatted += f"- Search Timestamp: {datetime.datetime.now().isoformat()}\n\n"
+        append("SEARCH METADATA:\n")
+        append(f"- Average Relevance Score: {score_sum / total:.4f}\n")
+        append(f"- Date Range: {self._format_date_range(oldest, newest)}\n")
+        append(f"- Unique Sources: {len(sources)}\n")
+        append(f"- Search Timestamp: {now.isoformat()}\n\n")
         
-        return formatted
+        return "".join(parts)
     
-    def _format_date(self, date_str: str) -> str:
+    def _format_date(self, date_str: str, now: Optional[datetime.datetime] = None) -> str:
         """Format date string with days ago"""
         if not date_str:
             return "Unknown date"
         
-        try:
-            if isinstance(date_str, str):
-                pub_date = datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            else:
-                pub_date = date_str
-            
-            days_ago = (datetime.datetime.now() - pub_date.replace(tzinfo=None)).days
-            
-            if days_ago == 0:
-                return "Today"
-            elif days_ago == 1:
-                return "1 day ago"
-            else:
-                return f"{days_ago} days ago ({pub_date.strftime('%Y-%m-%d')})"
-        except Exception:
+        if isinstance(date_str, datetime.datetime):
+            pub_date = date_str.replace(tzinfo=None)
+        else:
+            pub_date = parse_naive_datetime(date_str)
+        
+        if pub_date is None:
             return f"Unknown date ({date_str})"
+        return self._render_pub_date(pub_date, now or datetime.datetime.now())
     
-    def _get_date_range(self, results: List[Dict[str, Any]]) -> str:
-        """Get date range of results"""
-        dates = []
-        for result in results:
-            date_str = result.get('metadata', {}).get('published_at', '')
-            if date_str:
-                try:
-                    if isinstance(date_str, str):
-                        pub_date = datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                        dates.append(pub_date)
-                except Exception:
-                    continue
-        
-        if not dates:
+    def _render_pub_date(self, pub_date: datetime.datetime, now: datetime.datetime) -> str:
+        """Render a parsed publication date relative to now"""
+        days_ago = (now - pub_date).days
+        
+        if days_ago == 0:
+            return "Today"
+        elif days_ago == 1:
+            return "1 day ago"
+        else:
+            return f"{days_ago} days ago ({pub_date.strftime('%Y-%m-%d')})"
+    
+    def _format_date_range(self, oldest: Optional[datetime.datetime], newest: Optional[datetime.datetime]) -> str:
+        """Render the span between the oldest and newest publication dates"""
+        if oldest is None:
             return "Unknown"
         
-        oldest = min(dates)
-        newest = max(dates)
-        
         if oldest == newest:
             return oldest.strftime('%Y-%m-%d')
         else:
             return f"{oldest.strftime('%Y-%m-%d')} to {newest.strftime('%Y-%m-%d')}"
 
+_agent_lock = threading.Lock()
+
+@lru_cache(maxsize=4)
+def _build_agent(config_key: str) -> HyperLiquidAgent:
+    """Construct an agent from a serialized configuration"""
+    return HyperLiquidAgent(json.loads(config_key))
+
+def get_agent(config: Optional[Dict[str, Any]] = None) -> HyperLiquidAgent:
+    """Return a shared agent for the given configuration, creating it on first use"""
+    config_key = json.dumps(config or {}, sort_keys=True, default=str)
+    with _agent_lock:
+        return _build_agent(config_key)
+
 def query_hyperliquid_agent(query: str, config: Optional[Dict[str, Any]] = None) -> None:
     """Query HyperLiquid agent with enhanced formatting for frontend display"""
     
     print(f"\n🚀 **HYPERLIQUID MARKET INTELLIGENCE QUERY**")
     print(f"🔍 Query: {query}")
-    print("=" * 120)
+    print(_HEAVY_RULE)
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
-        # Initialize agent
+        # Reuse the agent across queries instead of reconnecting every time
         print("🔧 Initializing HyperLiquid Agent with TurboPuffer & Cohere...")
-        agent = HyperLiquidAgent(config)
+        agent = get_agent(config)
         
-        # Manual search to show process
+        # Search and show the process
         print("\n📡 **TURBOPUFFER DATA FETCH PROCESS**")
-        print("-" * 60)
+        print(_SECTION_RULE)
         
-        base_results = agent.vector_store.search(query, top_k=15)
-        print(f"📊 TurboPuffer base search: {len(base_results)} results")
+        # One pass through the same pipeline the search_mentions tool uses
+        outcome = agent.collect_mentions(query, 15)
+        reranked_results = outcome.results
         
-        related_queries = agent._generate_related_queries(query)
-        print(f"🔄 Generated {len(related_queries)} related queries: {related_queries}")
-        
-        all_results = base_results.copy()
-        for i, related_query in enumerate(related_queries[:3], 1):
-            try:
-                related_results = agent.vector_store.search(related_query, top_k=10)
-                all_results.extend(related_results)
-                print(f"   ├─ Query {i}: '{related_query}' -> +{len(related_results)} results")
-            except Exception:
+        print(f"📊 TurboPuffer base search: {outcome.base_count} results")
+        print(f"🔄 Generated {len(outcome.related)} related queries: {[q for q, _ in outcome.related]}")
+        for i, (related_query, count) in enumerate(outcome.related, 1):
+            if count is None:
                 print(f"   ├─ Query {i}: Failed")
-                continue
-        
-        unique_results = agent._deduplicate_results(all_results)
-        print(f"🔧 After deduplication: {len(unique_results)} unique results")
-        
-        reranked_results = agent.reranker.rerank(query, unique_results, top_k=15)
+            else:
+                print(f"   ├─ Query {i}: '{related_query}' -> +{count} results")
+        print(f"🔧 After deduplication: {outcome.unique_count} unique results")
         print(f"📈 Cohere reranking complete: {len(reranked_results)} final results")
         
+        # Nothing to analyze: skip the LLM round-trip entirely
+        if not reranked_results:
+            print(f"\n⚠️ No relevant results found for: {query}")
+            print(f"⏱️ Total execution time: {time.perf_counter() - start_time:.2f}s")
+            return
+        
         # Display all 15 results with reasoning
         print(f"\n📋 **ALL {len(reranked_results)} RERANKED RESULTS FROM TURBOPUFFER**")
-        print("=" * 120)
+        print(_HEAVY_RULE)
         
+        now = datetime.datetime.now()
+        blocks = []
         for i, result in enumerate(reranked_results, 1):
             metadata = result.get('metadata', {})
-            cohere_score = result.get('cohere_score', 0)
-            content = result.get('text', '')[:300]
-            
-            print(f"\n🎯 **RESULT #{i}** - Cohere Score: {cohere_score:.4f}")
-            print(f"📰 **Title:** {metadata.get('title', 'No title')}")
-            print(f"🏢 **Source:** {metadata.get('source_entity_name', 'Unknown')}")
-            print(f"📅 **Date:** {agent._format_date(metadata.get('published_at', ''))}")
-            print(f"🔗 **URL:** {metadata.get('url', 'No URL')}")
-            print(f"📝 **Content:** {content}...")
-            print(f"🧠 **Ranking Reasoning:** High semantic relevance to query (Cohere AI)")
-            print("-" * 80)
+            blocks.append(_DISPLAY_TEMPLATE.format(
+                i=i,
+                score=result.get('cohere_score', 0),
+                title=metadata.get('title', 'No title'),
+                source=metadata.get('source_entity_name', 'Unknown'),
+                date=agent._format_date(metadata.get('published_at', ''), now),
+                url=metadata.get('url', 'No URL'),
+                content=result.get('text', '')[:300],
+            ))
+        
+        # One write for the whole block instead of eight per result
+        sys.stdout.write("".join(blocks))
+        sys.stdout.flush()
         
         # Enhanced AI Agent Analysis with better formatting
         print(f"\n🤖 **AGNO AI AGENT COMPREHENSIVE ANALYSIS**")
-        print("=" * 120)
-        
-        enhanced_query = f"""
-        Based on the {len(reranked_results)} TurboPuffer search results for query: "{query}"
-        
-        Provide a comprehensive, well-structured market intelligence analysis using proper markdown formatting:
-        
-        ### 🔍 **DETAILED REASONING:**
+        print(_HEAVY_RULE)
         
-        #### Key Themes and Trends:
-        - Analyze ALL {len(reranked_results)} results comprehensively
-        - Identify major themes, sentiment patterns, and market trends
-        - Group findings by significance and relevance
-        - Assess temporal patterns and emerging developments
-        - Highlight consensus vs conflicting information
-        
-        #### Market Sentiment Analysis:
-        - Overall sentiment (bullish/bearish/neutral) with confidence level
-        - Key sentiment drivers and their impact
-        - Community perception and influencer opinions
-        - Risk factors and concerns identified
-        
-        #### Strategic Implications:
-        - What this means for HyperLiquid users and investors
-        - Actionable insights and recommendations
-        - Potential opportunities and threats
-        - Market positioning and competitive landscape
-        
-        ### 📊 **QUANTITATIVE INSIGHTS:**
-        
-        #### Key Metrics and Data Points:
-        - Extract specific numbers, percentages, and financial data
-        - Trading volumes, TVL changes, price movements
-        - User activity and adoption metrics
-        - Performance comparisons and benchmarks
-        
-        #### Confidence Assessment:
-        - **High Confidence** findings (supported by multiple credible sources)
-        - **Medium Confidence** findings (limited but credible evidence)
-        - **Low Confidence** findings (requires further verification)
-        
-        ### 🔗 **SOURCE ATTRIBUTION:**
-        
-        #### Primary Evidence (Quote key sources):
-        - Direct quotes from top 5-8 most relevant results
-        - Include source name, date, and result number
-        - Highlight credibility and authority of sources
-        - Note any potential bias or limitations
-        
-        #### Supporting Evidence:
-        - Additional corroborating information from other results
-        - Cross-references and validation from multiple sources
-        - Timeline of events and developments
-        
-        ### 💡 **EXECUTIVE SUMMARY:**
-        
-        #### Key Takeaways:
-        1. Most important finding with confidence level
-        2. Secondary insights and implications  
-        3. Risk factors and considerations
-        4. Recommended actions or monitoring points
-        
-        **Overall Assessment:** Provide a clear, actionable conclusion with confidence rating (1-10).
-        
-        ---
-        
-        **Analysis Requirements:**
-        - Use proper markdown headers (###, ####) for structure
-        - Include bullet points and numbered lists for clarity
-        - Bold important terms and findings
-        - Reference specific result numbers (Result #1, #2, etc.)
-        - Provide quantitative confidence levels where possible
-        - Include specific URLs for key claims
-        - Structure for easy frontend parsing and display
-        """
-        
-        response = agent.run(enhanced_query)
-        print(response.content if hasattr(response, 'content') else str(response))
+        # A repeat or near-duplicate question over the same results reuses its analysis
+        cached_analysis = agent.get_cached_analysis(query, reranked_results)
+        if cached_analysis is not None:
+            print(cached_analysis)
+        else:
+            # Stream tokens to stdout as they arrive instead of waiting for the full completion
+            for content in agent.stream_analysis(query, reranked_results):
+                print(content, end="", flush=True)
+            print()
         
         # Performance summary
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         print(f"\n✅ **ANALYSIS COMPLETE**")
-        print("=" * 120)
+        print(_HEAVY_RULE)
         print(f"📊 **Performance Metrics:**")
         print(f"   ├─ Total execution time: {execution_time:.2f}s")
         print(f"   ├─ Results processed: {len(reranked_results)}")
@@ -365,6 +676,13 @@ def query_hyperliquid_agent(query: str, config: Optional[Dict[str, Any]] = None)
         logger.error(f"Query execution failed: {e}")
         print(f"❌ **CRITICAL ERROR:** {str(e)}")
 
+async def query_hyperliquid_agent_async(query: str, config: Optional[Dict[str, Any]] = None) -> None:
+    """Async variant of query_hyperliquid_agent for callers running an event loop"""
+    # The Turbopuffer, Cohere and OpenAI clients used here are blocking, so the whole
+    # query runs on a worker thread while the loop keeps serving other requests
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, partial(query_hyperliquid_agent, query, config))
+
 # Configuration
 PRODUCTION_CONFIG = {
     'model_id': 'gpt-4o',
@@ -1,21 +1,21 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
+from fastapi.sse import EventSourceResponse, ServerSentEvent
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator, Tuple
 import asyncio
-import json
 import logging
 import time
-import subprocess
-import sys
+import orjson
 from contextlib import asynccontextmanager
+from itertools import islice
 import uvicorn
-import re
 from datetime import datetime, timedelta
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
-from agent import HyperLiquidAgent, PRODUCTION_CONFIG
+from agent import get_agent, PRODUCTION_CONFIG
+from cache import TTLCache
 from data_processor import DataProcessor
 from vector_store import VectorStore
 logging.basicConfig(level=logging.INFO)
@@ -23,13 +23,19 @@ logger = logging.getLogger(__name__)
 
 agent_instance = None
 
+# Batches embedded and upserted at once during background ingestion
+_INGEST_CONCURRENCY = 8
+
+# Finished /search response bodies per normalized (query, top_k); cleared after ingestion
+_search_responses = TTLCache(max_items=256, ttl_sec=300)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     global agent_instance
     try:
         logger.info("🚀 Initializing HyperLiquid Agent...")
-        agent_instance = HyperLiquidAgent(PRODUCTION_CONFIG)
+        agent_instance = get_agent(PRODUCTION_CONFIG)
         logger.info("✅ Agent initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize agent: {e}")
@@ -93,6 +99,7 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     ai_analysis: str
     performance_metrics: Dict[str, Any]
+    analysis_error: Optional[str] = None
 
 class IngestRequest(BaseModel):
     file_path: str
@@ -106,47 +113,18 @@ class StatusResponse(BaseModel):
     total_documents: Optional[int]
     performance_metrics: Dict[str, Any]
 
-def parse_cli_output_to_structured_data(cli_output: str, query: str, execution_time: float) -> Dict[str, Any]:
-    """Parse the CLI output into structured data for the frontend"""
-    
-    # Extract AI analysis section
-    ai_analysis = ""
-    ai_section_start = cli_output.find("🤖 **AGNO AI AGENT COMPREHENSIVE ANALYSIS**")
-    if ai_section_start != -1:
-        ai_section = cli_output[ai_section_start:]
-        # Extract everything after the analysis header until performance metrics
-        analysis_start = ai_section.find("### 🔍 **DETAILED REASONING:**")
-        if analysis_start != -1:
-            analysis_content = ai_section[analysis_start:]
-            performance_start = analysis_content.find("📊 **Performance Metrics:**")
-            if performance_start != -1:
-                ai_analysis = analysis_content[:performance_start].strip()
-            else:
-                ai_analysis = analysis_content.strip()
-    
-    # Extract structured results
-    results = []
-    result_sections = re.findall(
-        r'🎯 \*\*RESULT #(\d+)\*\* - Cohere Score: ([\d.]+)\s*'
-        r'📰 \*\*Title:\*\* (.+?)\s*'
-        r'🏢 \*\*Source:\*\* (.+?)\s*'
-        r'📅 \*\*Date:\*\* (\d+) days ago \(([^)]+)\)\s*'
-        r'🔗 \*\*URL:\*\* (.+?)\s*'
-        r'📝 \*\*Content:\*\* (.+?)(?=🧠|\n🎯|\Z)',
-        cli_output,
-        re.DOTALL
-    )
-    
-    for match in result_sections:
-        rank, score, title, source, days_ago, date, url, content = match
+def build_search_results(results: List[Dict[str, Any]]) -> List[SearchResult]:
+    """Convert reranked agent results into API search results"""
+    search_results = []
+    batch_stamp = int(time.time())
+    for rank, result in enumerate(results, 1):
+        metadata = result.get('metadata', {})
         
         # Clean up the content
-        content = content.strip().replace('\n', ' ')
-        if len(content) > 500:
-            content = content[:500] + "..."
+        content = result.get('text', '')[:300].strip().replace('\n', ' ')
         
         # Determine relevance category based on score
-        score_float = float(score)
+        score_float = float(result.get('cohere_score', 0))
         if score_float >= 0.8:
             relevance_category = "high"
         elif score_float >= 0.5:
@@ -154,38 +132,122 @@ def parse_cli_output_to_structured_data(cli_output: str, query: str, execution_t
         else:
             relevance_category = "low"
         
-        results.append(SearchResult(
-            id=f"result_{rank}_{int(time.time())}",
-            title=title.strip(),
-            source=source.strip(),
-            published_at=date.strip(),
-            url=url.strip(),
+        search_results.append(SearchResult(
+            id=str(result.get('id') or f"result_{rank}_{batch_stamp}"),
+            title=metadata.get('title') or 'No title',
+            source=metadata.get('source_entity_name') or 'Unknown',
+            published_at=str(metadata.get('published_at') or '')[:10],
+            url=metadata.get('url') or 'No URL',
             content=content,
             cohere_score=score_float,
             relevance_category=relevance_category,
-            days_ago=int(days_ago)
+            days_ago=result.get('days_ago', 999)
         ))
     
-    # Extract performance metrics
-    performance_metrics = {
-        "execution_time": execution_time,
-        "total_results_found": len(results),
-        "average_relevance_score": sum(r.cohere_score for r in results) / len(results) if results else 0,
-        "unique_sources": len(set(r.source for r in results)),
-        "data_pipeline": "TurboPuffer + Cohere + OpenAI GPT-4",
-        "search_method": "CLI Subprocess (Reliable)"
-    }
+    return search_results
+
+def build_search_response_data(query: str, results: List[Dict[str, Any]], ai_analysis: str, execution_time: float) -> Dict[str, Any]:
+    """Convert reranked agent results into structured data for the frontend"""
+    search_results = build_search_results(results)
     
     return {
         "query": query,
         "timestamp": time.time(),
         "execution_time": execution_time,
-        "total_results": len(results),
-        "results": [r.dict() for r in results],
+        "total_results": len(search_results),
+        "results": [r.dict() for r in search_results],
         "ai_analysis": ai_analysis,
-        "performance_metrics": performance_metrics
+        "analysis_error": None,
+        "performance_metrics": build_performance_metrics(search_results, execution_time)
+    }
+
+def build_performance_metrics(search_results: List[SearchResult], execution_time: float) -> Dict[str, Any]:
+    """Summarize a search for the response's performance metrics"""
+    return {
+        "execution_time": execution_time,
+        "total_results_found": len(search_results),
+        "average_relevance_score": sum(r.cohere_score for r in search_results) / len(search_results) if search_results else 0,
+        "unique_sources": len(set(r.source for r in search_results)),
+        "data_pipeline": "TurboPuffer + Cohere + OpenAI GPT-4",
+        "search_method": "In-process agent"
     }
 
+def search_cache_key(query: str, top_k: int) -> Tuple[str, int]:
+    """Key a search by case- and whitespace-normalized query and top_k"""
+    return (" ".join(query.lower().split()), top_k)
+
+async def stream_search_response(query: str, results: List[Dict[str, Any]], start_time: float,
+                                 cache_key: Optional[Tuple[str, int]] = None) -> AsyncIterator[bytes]:
+    """Stream the /search JSON document: results first, then the analysis as the model writes it"""
+    parts = []
+    analysis_error = None
+    search_results = build_search_results(results)
+    head = {
+        "query": query,
+        "timestamp": time.time(),
+        "total_results": len(search_results),
+        "results": [r.dict() for r in search_results]
+    }
+    
+    # Open the object and the ai_analysis string; each chunk is escaped into the string as it arrives
+    part = orjson.dumps(head)[:-1] + b',"ai_analysis":"'
+    parts.append(part)
+    yield part
+    
+    if results:
+        try:
+            cached_analysis = await asyncio.to_thread(agent_instance.get_cached_analysis, query, results)
+            if cached_analysis is not None:
+                part = orjson.dumps(cached_analysis)[1:-1]
+                parts.append(part)
+                yield part
+            else:
+                async for content in iterate_in_thread(agent_instance.stream_analysis(query, results)):
+                    part = orjson.dumps(content)[1:-1]
+                    parts.append(part)
+                    yield part
+        except Exception as e:
+            # Headers are already sent, so close the document with whatever analysis arrived
+            # and report the failure in the body
+            logger.error(f"Analysis failed: {e}")
+            analysis_error = str(e)
+    
+    execution_time = time.perf_counter() - start_time
+    tail = {
+        "analysis_error": analysis_error,
+        "execution_time": execution_time,
+        "performance_metrics": build_performance_metrics(search_results, execution_time)
+    }
+    part = b'",' + orjson.dumps(tail)[1:]
+    parts.append(part)
+    yield part
+    
+    # Only whole documents over real results are reused; a truncated analysis or an empty
+    # search (possibly a Turbopuffer outage) should be retried
+    if cache_key is not None and analysis_error is None and search_results:
+        _search_responses.set(cache_key, b"".join(parts))
+    
+    logger.info(f"✅ Search completed in {execution_time:.2f}s with {len(search_results)} results")
+
+def sse_event(payload: Dict[str, Any]) -> ServerSentEvent:
+    """Build one server-sent event whose data is the payload pre-encoded with orjson"""
+    return ServerSentEvent(raw_data=orjson.dumps(payload).decode())
+
+def require_agent():
+    """Dependency returning the initialized agent, or failing with 503 before any response starts"""
+    if not agent_instance:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    return agent_instance
+
+async def iterate_in_thread(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """Drain a blocking iterator one item at a time on worker threads"""
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
 # API Routes
 
 @app.get("/", tags=["Health"])
@@ -240,7 +302,7 @@ async def get_status():
 
 @app.post("/search", response_model=SearchResponse, tags=["Search"])
 async def search_hyperliquid(request: SearchRequest):
-    """Search HyperLiquid mentions with AI analysis - BACK TO CLI METHOD (IT WORKS!)"""
+    """Search HyperLiquid mentions with AI analysis"""
     if not agent_instance:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
@@ -250,97 +312,85 @@ async def search_hyperliquid(request: SearchRequest):
     if request.top_k <= 0 or request.top_k > 50:
         raise HTTPException(status_code=400, detail="top_k must be between 1 and 50")
     
-    start_time = time.time()
+    # Identical searches within the TTL get the finished body without touching the pipeline
+    cache_key = search_cache_key(request.query, request.top_k)
+    cached_body = _search_responses.get(cache_key)
+    if cached_body is not None:
+        logger.info(f"⚡ Serving cached search response: '{request.query}'")
+        return Response(cached_body, media_type="application/json")
+    
+    start_time = time.perf_counter()
     
     try:
         logger.info(f"🔍 Processing search request: '{request.query}'")
         
-        # BACK TO THE WORKING CLI METHOD - DON'T BREAK WHAT WORKS!
-        cmd = [
-            sys.executable, "main.py", "search", 
-            request.query,
-            "--top-k", str(request.top_k),
-            "--output-format", "detailed"
-        ]
-        
-        # Execute the command and capture output - NO TIMEOUT
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            # REMOVED TIMEOUT - LET IT RUN AS LONG AS NEEDED
-        )
-        
-        execution_time = time.time() - start_time
+        # Search before the response starts so failures still surface as HTTP errors
+        outcome = await asyncio.to_thread(agent_instance.collect_mentions, request.query, request.top_k)
         
-        if result.returncode != 0:
-            logger.error(f"CLI command failed: {result.stderr}")
-            raise HTTPException(status_code=500, detail=f"Search failed: {result.stderr}")
-        
-        # Parse the CLI output into structured data
-        structured_data = parse_cli_output_to_structured_data(
-            result.stdout, 
-            request.query, 
-            execution_time
-        )
-        
-        logger.info(f"✅ Search completed in {execution_time:.2f}s with {len(structured_data['results'])} results")
-        return SearchResponse(**structured_data)
-        
-    except subprocess.TimeoutExpired:
-        logger.error("Search timeout")
-        raise HTTPException(status_code=504, detail="Search request timed out")
     except Exception as e:
         logger.error(f"Search failed: {e}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
-
-@app.post("/search/stream", tags=["Search"])
-async def search_stream(request: SearchRequest):
-    """Stream search results in real-time"""
-    if not agent_instance:
-        raise HTTPException(status_code=503, detail="Agent not initialized")
-    
-    async def generate_stream():
-        try:
-            # Yield initial status
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Starting search...'})}\n\n"
-            
-            # Yield search progress
-            yield f"data: {json.dumps({'type': 'progress', 'message': 'Searching TurboPuffer...'})}\n\n"
-            
-            # Run the search using CLI (the method that works)
-            cmd = [
-                sys.executable, "main.py", "search", 
-                request.query,
-                "--top-k", str(request.top_k),
-                "--output-format", "detailed"
-            ]
-            
-            # Execute and stream results
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Wait for completion
-            stdout, stderr = process.communicate()
-            
-            if process.returncode == 0:
-                yield f"data: {json.dumps({'type': 'complete', 'output': stdout})}\n\n"
-            else:
-                yield f"data: {json.dumps({'type': 'error', 'message': stderr})}\n\n"
-            
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
     
+    # Results go out as soon as they are reranked; the analysis follows as the model writes it.
+    # Degraded outcomes (empty search or Cohere fallback) are served but never cached
     return StreamingResponse(
-        generate_stream(),
-        media_type="text/plain",
-        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+        stream_search_response(request.query, outcome.results, start_time,
+                               None if outcome.degraded else cache_key),
+        media_type="application/json"
     )
 
+async def run_search(query: str, top_k: int) -> Dict[str, Any]:
+    """Run the search pipeline and return the structured response data"""
+    cache_key = search_cache_key(query, top_k)
+    cached_body = _search_responses.get(cache_key)
+    if cached_body is not None:
+        return orjson.loads(cached_body)
+    
+    start_time = time.perf_counter()
+    
+    # Run the pipeline on the already-initialized agent instead of spawning a CLI process;
+    # it blocks on network calls, so it runs on a worker thread off the event loop
+    outcome, ai_analysis = await asyncio.to_thread(agent_instance.search_with_analysis, query, top_k)
+    
+    execution_time = time.perf_counter() - start_time
+    structured_data = build_search_response_data(query, outcome.results, ai_analysis, execution_time)
+    if outcome.results and not outcome.degraded:
+        _search_responses.set(cache_key, orjson.dumps(structured_data))
+    return structured_data
+
+@app.post("/search/stream", response_class=EventSourceResponse, tags=["Search"])
+async def search_stream(request: SearchRequest, agent=Depends(require_agent)) -> AsyncIterator[ServerSentEvent]:
+    """Stream search results in real-time"""
+    try:
+        # Yield initial status
+        yield sse_event({'type': 'status', 'message': 'Starting search...'})
+        
+        # Yield search progress
+        yield sse_event({'type': 'progress', 'message': 'Searching TurboPuffer...'})
+        
+        start_time = time.perf_counter()
+        
+        # Search on a worker thread so the event loop keeps serving other requests
+        outcome = await asyncio.to_thread(agent.collect_mentions, request.query, request.top_k)
+        results = [r.dict() for r in build_search_results(outcome.results)]
+        yield sse_event({'type': 'results', 'results': results})
+        
+        # Stream the analysis as the model produces it (or the cached one in a single event)
+        if outcome.results:
+            cached_analysis = await asyncio.to_thread(agent.get_cached_analysis, request.query, outcome.results)
+            if cached_analysis is not None:
+                yield sse_event({'type': 'analysis', 'content': cached_analysis})
+            else:
+                analysis = agent.stream_analysis(request.query, outcome.results)
+                async for content in iterate_in_thread(analysis):
+                    yield sse_event({'type': 'analysis', 'content': content})
+        
+        execution_time = time.perf_counter() - start_time
+        yield sse_event({'type': 'complete', 'execution_time': execution_time})
+        
+    except Exception as e:
+        yield sse_event({'type': 'error', 'message': str(e)})
+
 @app.post("/ingest", tags=["Data Management"])
 async def ingest_data(request: IngestRequest, background_tasks: BackgroundTasks):
     """Ingest data into vector store"""
@@ -365,19 +415,66 @@ async def run_ingestion(file_path: str, batch_size: int, force: bool):
         logger.info(f"🚀 Starting background ingestion: {file_path}")
         
         processor = DataProcessor()
-        vector_store = VectorStore()
+        vector_store = agent_instance.vector_store if agent_instance else VectorStore()
+        
+        # Stream chunks off the file so only the batches in flight are held in memory
+        chunks = processor.iter_chunks(processor.iter_mentions(file_path))
+        
+        # Store batches concurrently on worker threads; the semaphore caps in-flight
+        # embedding/upsert calls (and so buffered batches) instead of sleeping between them
+        semaphore = asyncio.Semaphore(_INGEST_CONCURRENCY)
+        stored_batches = 0
         
-        # Process file
-        mentions = processor.process_jsonl_file(file_path)
-        chunks = processor.create_chunks(mentions)
+        async def store_batch(batch: List[Dict[str, Any]]) -> None:
+            nonlocal stored_batches
+            try:
+                await asyncio.to_thread(vector_store.store_chunks, batch)
+                stored_batches += 1
+            finally:
+                semaphore.release()
+        
+        pending = set()
+        failures = []
+        
+        def on_batch_done(task: asyncio.Task) -> None:
+            pending.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(task.exception())
         
-        # Store in batches
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            vector_store.store_chunks(batch)
-            await asyncio.sleep(0.1)  # Prevent rate limiting
+        total_chunks = 0
+        try:
+            while not failures:
+                await semaphore.acquire()
+                # A batch may have failed while waiting; stop before reading any more
+                if failures:
+                    semaphore.release()
+                    break
+                # Parsing is blocking file work too, so read each batch on a worker thread
+                batch = await asyncio.to_thread(list, islice(chunks, batch_size))
+                if not batch:
+                    semaphore.release()
+                    break
+                total_chunks += len(batch)
+                task = asyncio.create_task(store_batch(batch))
+                pending.add(task)
+                task.add_done_callback(on_batch_done)
+            
+            # The first failed batch fails the ingestion: cancel what is still in flight
+            if failures:
+                for task in pending:
+                    task.cancel()
+            await asyncio.gather(*list(pending), return_exceptions=True)
+            if failures:
+                raise failures[0]
+        finally:
+            # Stored batches are searchable even if a later one failed, so every cache
+            # on the query path may now hold pre-ingestion results
+            if stored_batches:
+                _search_responses.clear()
+                if agent_instance:
+                    agent_instance.invalidate_caches()
         
-        logger.info(f"✅ Ingestion completed: {len(chunks)} chunks processed")
+        logger.info(f"✅ Ingestion completed: {total_chunks} chunks processed")
         
     except Exception as e:
         logger.error(f"❌ Background ingestion failed: {e}")
@@ -399,13 +496,12 @@ async def run_demo():
     for query in demo_queries:
         try:
             # Run a smaller search for demo
-            search_request = SearchRequest(query=query, top_k=5)
-            search_response = await search_hyperliquid(search_request)
+            search_response = await run_search(query, 5)
             
             results.append({
                 "query": query,
-                "results": search_response.results[:3],  # Limit for demo
-                "execution_time": search_response.execution_time
+                "results": search_response['results'][:3],  # Limit for demo
+                "execution_time": search_response['execution_time']
             })
         except Exception as e:
             results.append({
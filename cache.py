@@ -0,0 +1,192 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+class TTLCache:
+    """Thread-safe LRU cache with optional per-entry expiry"""
+
+    def __init__(self, max_items: int = 1024, ttl_sec: Optional[float] = 60.0):
+        """Create a cache holding at most max_items entries for ttl_sec seconds (None = no expiry)"""
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entries if full"""
+        expires_at = time.monotonic() + self.ttl_sec if self.ttl_sec is not None else None
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters along with the current size"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+class SemanticCache:
+    """Response cache that matches exact normalized queries first, then near-duplicate query embeddings"""
+
+    def __init__(self, embed: Optional[Callable[[str], List[float]]] = None, max_items: int = 256,
+                 ttl_sec: Optional[float] = 3600.0, threshold: float = 0.95):
+        """Create a cache; embed maps a query to a vector and enables the similarity tier"""
+        self.embed = embed
+        self.threshold = threshold
+        self._responses = TTLCache(max_items=max_items, ttl_sec=ttl_sec)
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._max_vectors = max_items
+        # Stacked copy of _vectors scored with one matmul; rebuilt lazily after puts
+        self._keys: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        # Counted here rather than by _responses, which sees several lookups per similarity match
+        self.exact_hits = self.semantic_hits = self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        return " ".join(_PUNCTUATION_RE.sub(" ", query.lower()).split())
+
+    def get(self, query: str) -> Any:
+        """Return the cached response for query or a near-identical one, else None"""
+        key = self.normalize(query)
+        hit = self._responses.get(key)
+        if hit is not None:
+            self._count('exact_hits')
+            return hit
+
+        vector = self._unit_vector(query) if self.embed is not None else None
+        if vector is not None:
+            with self._lock:
+                if self._matrix is None and self._vectors:
+                    self._keys = list(self._vectors)
+                    self._matrix = np.vstack(list(self._vectors.values()))
+                keys, matrix = self._keys, self._matrix
+
+            if matrix is not None:
+                # Try every match above the threshold, best first, in case the best has expired
+                scores = matrix @ vector
+                candidates = np.flatnonzero(scores >= self.threshold)
+                stale = []
+                for index in candidates[np.argsort(-scores[candidates])]:
+                    hit = self._responses.get(keys[index])
+                    if hit is not None:
+                        break
+                    stale.append(keys[index])
+
+                # Embeddings whose responses expired or were evicted can never match again
+                if stale:
+                    self._drop_vectors(stale)
+                if hit is not None:
+                    self._count('semantic_hits')
+                    return hit
+
+        self._count('misses')
+        return None
+
+    def put(self, query: str, response: Any) -> None:
+        """Cache response under the normalized query (and its embedding, if available)"""
+        key = self.normalize(query)
+        self._responses.set(key, response)
+
+        if self.embed is None:
+            return
+
+        vector = self._unit_vector(query)
+        if vector is None:
+            return
+
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self._max_vectors:
+                self._vectors.popitem(last=False)
+            self._matrix = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return exact and semantic hit counts, misses, evictions and the number of stored embeddings"""
+        responses = self._responses.stats()
+        with self._lock:
+            return {
+                'size': responses['size'],
+                'hits': self.exact_hits + self.semantic_hits,
+                'exact_hits': self.exact_hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'evictions': responses['evictions'],
+                'embeddings': len(self._vectors),
+            }
+
+    def clear(self) -> None:
+        """Drop all cached responses and embeddings"""
+        self._responses.clear()
+        with self._lock:
+            self._vectors.clear()
+            self._keys = []
+            self._matrix = None
+
+    def _count(self, counter: str) -> None:
+        """Increment one of the lookup counters"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _drop_vectors(self, keys: List[str]) -> None:
+        """Forget the embeddings of responses that are no longer cached"""
+        with self._lock:
+            for key in keys:
+                self._vectors.pop(key, None)
+            self._matrix = None
+
+    def _unit_vector(self, query: str) -> Optional[np.ndarray]:
+        """Embed query and scale to unit length so cosine similarity is a dot product"""
+        try:
+            vector = np.asarray(self.embed(query), dtype=np.float32)
+        except Exception:
+            return None
+
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            return None
+        return vector / norm
@@ -1,8 +1,23 @@
 import json
-from typing import List, Dict, Any
+from itertools import chain
+from typing import BinaryIO, Iterator, List, Dict, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from dates import parse_iso_datetime
+
+try:
+    import ijson
+except ImportError:  # Without ijson the whole file is loaded before parsing
+    ijson = None
+
+def _parse_events(file: BinaryIO, found: Dict[str, Any]) -> Iterator[Tuple[str, str, Any]]:
+    """Yield ijson parse events, recording metadata.total_mentions in found as it goes by"""
+    for event in ijson.parse(file, use_float=True):
+        if event[0] == 'metadata.total_mentions':
+            found['total_mentions'] = event[2]
+        yield event
+
 @dataclass
 class ProcessedMention:
     id: str
@@ -22,15 +37,41 @@ class DataProcessor:
     
     def process_jsonl_file(self, file_path: str) -> List[ProcessedMention]:
         """Process JSON file and extract mentions"""
-        mentions = []
+        return list(self.iter_mentions(file_path))
+    
+    def iter_mentions(self, file_path: str) -> Iterator[ProcessedMention]:
+        """Yield unique mentions from the JSON file, parsing it incrementally when ijson is available"""
+        count = 0
         seen_ids = set()
+        # Bound once outside the per-mention loop
+        seen_ids_add = seen_ids.add
+        parse_date = parse_iso_datetime
+        # Undated mentions all get the same ingest time instead of a clock read each
+        ingested_at = datetime.now()
         
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        with open(file_path, 'rb') as file:
+            found: Dict[str, Any] = {}
+            if ijson is not None:
+                # One pass over the file: read ahead until the total or the mentions array,
+                # whichever comes first, then hand the rest of the events to the item parser
+                events = _parse_events(file, found)
+                head = []
+                for event in events:
+                    head = [event]
+                    if found or event[0] == 'mentions':
+                        break
+                total_mentions = found.get('total_mentions')
+                mention_items = ijson.items(chain(head, events), 'mentions.item')
+            else:
+                data = json.load(file)
+                total_mentions = data.get('metadata', {}).get('total_mentions', 0)
+                mention_items = data.get('mentions', [])
             
-            print(f"Total mentions in dataset: {data.get('metadata', {}).get('total_mentions', 0)}")
+            # Metadata after the mentions is only seen once they are parsed, so it is reported at the end
+            if total_mentions is not None:
+                print(f"Total mentions in dataset: {total_mentions}")
             
-            for mention_data in data.get('mentions', []):
+            for mention_data in mention_items:
                 try:
                     # Extract nested data
                     publication = mention_data.get('publication', {})
@@ -43,20 +84,15 @@ class DataProcessor:
                     if not mention_id or mention_id in seen_ids:
                         continue
                     
-                    seen_ids.add(mention_id)
+                    seen_ids_add(mention_id)
                     
                     # Parse published_at
-                    try:
-                        published_at_str = publication.get('published_at', '')
+                    published_at_str = publication.get('published_at', '')
+                    published_at = parse_date(published_at_str)
+                    if published_at is None:
                         if published_at_str:
-                            if published_at_str.endswith('Z'):
-                                published_at_str = published_at_str.replace('Z', '+00:00')
-                            published_at = datetime.fromisoformat(published_at_str)
-                        else:
-                            published_at = datetime.now()
-                    except Exception as e:
-                        print(f"Error parsing date for mention {mention_id}: {e}")
-                        published_at = datetime.now()
+                            print(f"Error parsing date for mention {mention_id}: {published_at_str!r}")
+                        published_at = ingested_at
                     
                     # Create processed mention
                     processed_mention = ProcessedMention(
@@ -72,19 +108,26 @@ class DataProcessor:
                         hyperliquid_tokens=hyperliquid_info.get('tokens', [])
                     )
                     
-                    mentions.append(processed_mention)
+                    count += 1
+                    yield processed_mention
                     
                 except Exception as e:
                     print(f"Error processing mention: {e}")
                     continue
+            
+            if total_mentions is None:
+                print(f"Total mentions in dataset: {found.get('total_mentions', 0)}")
         
-        print(f"Successfully processed {len(mentions)} unique mentions")
-        return mentions
+        print(f"Successfully processed {count} unique mentions")
     
     def create_chunks(self, mentions: List[ProcessedMention]) -> List[Dict[str, Any]]:
         """Create searchable chunks from mentions"""
-        chunks = []
-        
+        chunks = list(self.iter_chunks(mentions))
+        print(f"Created {len(chunks)} chunks from {len(mentions)} mentions")
+        return chunks
+    
+    def iter_chunks(self, mentions: Iterator[ProcessedMention]) -> Iterator[Dict[str, Any]]:
+        """Yield searchable chunks from mentions as they are consumed"""
         for mention in mentions:
             # Combine title, summary, and content for better search
             text_parts = []
@@ -115,7 +158,4 @@ class DataProcessor:
                     'hyperliquid_tokens': mention.hyperliquid_tokens
                 }
             }
-            chunks.append(chunk)
-        
-        print(f"Created {len(chunks)} chunks from {len(mentions)} mentions")
-        return chunks
\ No newline at end of file
+            yield chunk
\ No newline at end of file
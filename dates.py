@@ -0,0 +1,28 @@
+import datetime
+import sys
+from functools import lru_cache
+from typing import Any, Optional
+
+# Python 3.11+ fromisoformat understands a trailing 'Z' without rewriting it
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+@lru_cache(maxsize=4096)
+def _parse_iso_string(value: str) -> Optional[datetime.datetime]:
+    """Parse an ISO-8601 string as written (memoized, the same timestamps recur heavily)"""
+    if not _FROMISOFORMAT_ACCEPTS_Z and value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def parse_iso_datetime(value: Any) -> Optional[datetime.datetime]:
+    """Parse an ISO-8601 timestamp, keeping any timezone; None if missing or malformed"""
+    if not value or not isinstance(value, str):
+        return None
+    return _parse_iso_string(value)
+
+def parse_naive_datetime(value: Any) -> Optional[datetime.datetime]:
+    """Parse an ISO-8601 timestamp and drop its timezone, for arithmetic against naive now()"""
+    parsed = parse_iso_datetime(value)
+    return parsed.replace(tzinfo=None) if parsed is not None else None
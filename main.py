@@ -1,7 +1,9 @@
 import click
+import sys
 import time
 import json
 import logging
+from contextlib import redirect_stdout
 from typing import Dict, Any, Optional
 from pathlib import Path
 
@@ -65,7 +67,7 @@ def cli(ctx, debug, config_file):
 def ingest(ctx, jsonl_file, batch_size, force):
     """Ingest JSONL data into vector store with production optimizations"""
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         click.echo("🚀 Starting HyperLiquid data ingestion...")
@@ -122,7 +124,7 @@ def ingest(ctx, jsonl_file, batch_size, force):
         click.echo("\n🔍 Verifying ingestion...")
         test_results = vector_store.search("HyperLiquid", top_k=5)
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         if test_results:
             click.echo(f"✅ Ingestion successful!")
@@ -160,7 +162,7 @@ def search(ctx, query, top_k, output_format, save_results):
         python main.py search "influencer tweets" --output-format summary
     """
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         # Validate inputs
@@ -177,24 +179,27 @@ def search(ctx, query, top_k, output_format, save_results):
         config['top_k'] = top_k
         config['output_format'] = output_format
         
-        click.echo(f"🔍 Searching: '{query}'")
-        click.echo(f"📊 Results: {top_k} | Format: {output_format}")
-        click.echo("=" * 80)
-        
-        if output_format == 'json':
-            # JSON output for programmatic use
-            from agent import HyperLiquidAgent
-            agent = HyperLiquidAgent(config)
-            results = agent.search_mentions(query, top_k)
+        # In JSON mode stdout carries only the JSON document, so banners go to stderr
+        json_mode = output_format == 'json'
+        click.echo(f"🔍 Searching: '{query}'", err=json_mode)
+        click.echo(f"📊 Results: {top_k} | Format: {output_format}", err=json_mode)
+        click.echo("=" * 80, err=json_mode)
+        
+        if json_mode:
+            # JSON output for programmatic use; pipeline progress prints are sent to stderr
+            from agent import get_agent
+            with redirect_stdout(sys.stderr):
+                agent = get_agent(config)
+                results = agent.search_mentions_json(query, top_k)
             
             json_output = {
                 'query': query,
                 'timestamp': time.time(),
-                'execution_time': time.time() - start_time,
+                'execution_time': time.perf_counter() - start_time,
                 'results': results
             }
             
-            output_text = json.dumps(json_output, indent=2)
+            output_text = json.dumps(json_output, indent=2, default=str)
             click.echo(output_text)
             
         elif output_format == 'summary':
@@ -209,7 +214,7 @@ def search(ctx, query, top_k, output_format, save_results):
         
         # Save results if requested
         if save_results:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             save_path = Path(save_results)
             
             with open(save_path, 'w') as f:
@@ -219,7 +224,7 @@ def search(ctx, query, top_k, output_format, save_results):
                 f.write("=" * 80 + "\n\n")
                 # Results would be written here in a real implementation
             
-            click.echo(f"\n💾 Results saved to: {save_path}")
+            click.echo(f"\n💾 Results saved to: {save_path}", err=json_mode)
         
     except Exception as e:
         logger.error(f"Search failed: {e}")
@@ -285,13 +290,13 @@ def status(export_format, output_file):
     """Show system status and performance metrics"""
     
     try:
-        from agent import HyperLiquidAgent
+        from agent import get_agent
         
         click.echo("📊 HyperLiquid Agent System Status")
         click.echo("=" * 50)
         
-        # Initialize agent to get metrics
-        agent = HyperLiquidAgent()
+        # Reuse the shared agent to get metrics
+        agent = get_agent()
         
         # Test vector store connectivity
         click.echo("\n🔗 Connectivity Tests:")
@@ -344,8 +349,8 @@ def trends(days, save_report):
     try:
         click.echo(f"📈 Generating {days}-day trend analysis...")
         
-        from agent import HyperLiquidAgent
-        agent = HyperLiquidAgent()
+        from agent import get_agent
+        agent = get_agent()
         
         # Generate trends report
         trends_report = agent.analyze_trends(f"{days}d")
@@ -1,15 +1,45 @@
 import cohere
 import os
+import random
 import logging
 import time
-from typing import List, Dict, Any, Optional, Tuple
+import datetime
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import islice
+from concurrent.futures import Future
+from typing import List, Deque, Dict, Any, Optional, Tuple, Hashable, Sequence
 from dataclasses import dataclass
 from functools import wraps
 import json
+import re
+
+from cache import TTLCache
+from dates import parse_naive_datetime
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Crypto/DeFi context keywords, matched in a single case-insensitive pass
+_CRYPTO_KEYWORDS = ('DeFi', 'DEX', 'trading', 'liquidity', 'yield', 'vault', 'token')
+_CRYPTO_KEYWORD_RE = re.compile('|'.join(re.escape(k) for k in _CRYPTO_KEYWORDS), re.IGNORECASE)
+
+# Recency buckets: at most 1 day, a week, a month, 3 months, a year, then older
+_RECENCY_DAY_BOUNDS = (1, 7, 30, 90, 365)
+_RECENCY_SCORES = (1.0, 0.9, 0.7, 0.5, 0.3, 0.1)
+
+# Relevance categories by Cohere score: below 0.2, 0.2+, 0.5+, 0.8+
+_RELEVANCE_BOUNDS = (0.2, 0.5, 0.8)
+_RELEVANCE_CATEGORIES = ('minimal', 'low', 'medium', 'high')
+
+# Reasons shown in the ranking report: up to 0.4, above 0.4, above 0.7
+_REASON_BOUNDS = (0.4, 0.7)
+_REASON_LABELS = ("Moderate relevance", "Good semantic relevance", "High semantic relevance")
+
+# Separator between entries in the TOP SOURCES report
+_SOURCE_SEPARATOR = "\n" + "─" * 50 + "\n\n"
+
 @dataclass
 class RerankingMetrics:
     """Track reranking performance metrics"""
@@ -33,7 +63,16 @@ class AdvancedCohereReranker:
         
         self.config = config or {}
         self.client = cohere.Client(self.api_key)
-        self.metrics_history: List[RerankingMetrics] = []
+        # Bounded window of recent metrics with running totals over its successful entries,
+        # so get_performance_metrics doesn't rescan the history
+        self.metrics_history: Deque[RerankingMetrics] = deque(maxlen=self.config.get('metrics_window', 1000))
+        self._metrics_lock = threading.Lock()
+        self._success_count = 0
+        self._high_relevance_count = 0
+        self._sum_execution_time = 0.0
+        self._sum_relevance = 0.0
+        self._sum_original_count = 0
+        self._sum_reranked_count = 0
         
         # Production settings
         self.model = self.config.get('model', 'rerank-english-v3.0')
@@ -42,8 +81,22 @@ class AdvancedCohereReranker:
         self.max_doc_length = self.config.get('max_doc_length', 1000)
         self.relevance_threshold = self.config.get('relevance_threshold', 0.1)
         
+        # Rerank calls currently being served, so identical concurrent requests share one API call
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Recent successful Cohere rankings, so a repeat request within the TTL skips the API
+        self._results_cache = TTLCache(
+            max_items=self.config.get('rerank_cache_size', 256),
+            ttl_sec=self.config.get('rerank_cache_ttl', 300)
+        )
+        
         logger.info(f"Initialized AdvancedCohereReranker with model: {self.model}")
     
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with +/-50% jitter so concurrent callers don't retry in lockstep"""
+        return self.retry_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+    
     def retry_on_failure(self, max_retries: int = None):
         """Decorator for API retry logic"""
         max_retries = max_retries or self.max_retries
@@ -61,8 +114,8 @@ class AdvancedCohereReranker:
                         logger.warning(f"Cohere API error (attempt {attempt + 1}/{max_retries}): {e}")
                         
                         if attempt < max_retries - 1:
-                            wait_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                            logger.info(f"Retrying in {wait_time}s...")
+                            wait_time = self._backoff_delay(attempt)  # Exponential backoff with jitter
+                            logger.info(f"Retrying in {wait_time:.2f}s...")
                             time.sleep(wait_time)
                     except Exception as e:
                         last_exception = e
@@ -73,71 +126,6 @@ class AdvancedCohereReranker:
             return wrapper
         return decorator
     
-    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: int = 15) -> List[Dict[str, Any]]:
-        """High-accuracy reranking with advanced document processing"""
-        
-        if not results:
-            logger.warning("No results provided for reranking")
-            return []
-        
-        if not query or not query.strip():
-            logger.error("Empty query provided for reranking")
-            return results[:top_k]
-        
-        start_time = time.time()
-        
-        # Apply retry logic manually
-        max_retries = self.max_retries
-        last_exception = None
-        
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Starting Cohere reranking: query='{query[:50]}...', results={len(results)}, top_k={top_k}")
-                
-                # Advanced document preparation
-                documents, metadata_map = self._prepare_documents_for_reranking(results)
-                
-                if not documents:
-                    logger.warning("No valid documents after preparation")
-                    return results[:top_k]
-                
-                # Call Cohere rerank API with optimized parameters
-                response = self._call_cohere_api(query, documents, top_k)
-                
-                # Process and enhance results
-                reranked_results = self._process_rerank_response(response, results, metadata_map)
-                
-                # Calculate and store metrics
-                execution_time = time.time() - start_time
-                self._store_metrics(query, len(results), len(reranked_results), reranked_results, execution_time, True)
-                
-                logger.info(f"Reranking completed: {len(reranked_results)} results in {execution_time:.3f}s")
-                return reranked_results
-                
-            except cohere.errors.CohereAPIError as e:
-                last_exception = e
-                logger.warning(f"Cohere API error (attempt {attempt + 1}/{max_retries}): {e}")
-                
-                if attempt < max_retries - 1:
-                    wait_time = self.retry_delay * (2 ** attempt)
-                    logger.info(f"Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-            except Exception as e:
-                last_exception = e
-                logger.error(f"Unexpected error in reranking: {e}")
-                break
-        
-        # If all retries failed, store error and return fallback
-        execution_time = time.time() - start_time
-        logger.error(f"Reranking failed after {max_retries} attempts: {last_exception}")
-        
-        # Store error metrics
-        self._store_metrics(query, len(results), 0, [], execution_time, False, str(last_exception))
-        
-        # Fallback to original results
-        logger.info("Falling back to original result order")
-        return results[:top_k]
-    
     def _prepare_documents_for_reranking(self, results: List[Dict[str, Any]]) -> Tuple[List[str], Dict[int, int]]:
         """Advanced document preparation with context optimization"""
         documents = []
@@ -151,13 +139,13 @@ class AdvancedCohereReranker:
                     documents.append(doc_text)
                     metadata_map[len(documents) - 1] = idx
                 else:
-                    logger.debug(f"Skipping result {idx}: insufficient content")
+                    logger.debug("Skipping result %d: insufficient content", idx)
                     
             except Exception as e:
                 logger.warning(f"Error preparing document {idx}: {e}")
                 continue
         
-        logger.debug(f"Prepared {len(documents)} documents from {len(results)} results")
+        logger.debug("Prepared %d documents from %d results", len(documents), len(results))
         return documents, metadata_map
     
     def _create_rich_document_context(self, result: Dict[str, Any]) -> str:
@@ -264,7 +252,7 @@ class AdvancedCohereReranker:
         # Enhanced query for better matching
         enhanced_query = self._enhance_query_for_hyperliquid(query)
         
-        logger.debug(f"Calling Cohere API: model={self.model}, query_len={len(enhanced_query)}, docs={len(documents)}, top_n={top_n}")
+        logger.debug("Calling Cohere API: model=%s, query_len=%d, docs=%d, top_n=%d", self.model, len(enhanced_query), len(documents), top_n)
         
         response = self.client.rerank(
             model=self.model,
@@ -286,8 +274,7 @@ class AdvancedCohereReranker:
             enhanced_query = f"HyperLiquid {query}"
         
         # Add crypto/DeFi context
-        crypto_keywords = ['DeFi', 'DEX', 'trading', 'liquidity', 'yield', 'vault', 'token']
-        if not any(keyword.lower() in query.lower() for keyword in crypto_keywords):
+        if not _CRYPTO_KEYWORD_RE.search(query):
             enhanced_query += " cryptocurrency DeFi"
         
         return enhanced_query
@@ -295,6 +282,7 @@ class AdvancedCohereReranker:
     def _process_rerank_response(self, response: Any, original_results: List[Dict[str, Any]], metadata_map: Dict[int, int]) -> List[Dict[str, Any]]:
         """Process Cohere response with advanced result enhancement"""
         reranked_results = []
+        rerank_timestamp = time.time()
         
         for rank_idx, result in enumerate(response.results):
             try:
@@ -311,7 +299,7 @@ class AdvancedCohereReranker:
                 
                 # Skip results below relevance threshold
                 if relevance_score < self.relevance_threshold:
-                    logger.debug(f"Skipping result with low relevance: {relevance_score:.4f}")
+                    logger.debug("Skipping result with low relevance: %.4f", relevance_score)
                     continue
                 
                 # Add comprehensive Cohere metadata
@@ -319,19 +307,12 @@ class AdvancedCohereReranker:
                     'cohere_score': relevance_score,
                     'cohere_rank': rank_idx + 1,
                     'cohere_model': self.model,
-                    'rerank_timestamp': time.time(),
+                    'rerank_timestamp': rerank_timestamp,
                     'original_index': original_idx
                 })
                 
                 # Add relevance categorization
-                if relevance_score >= 0.8:
-                    original_result['relevance_category'] = 'high'
-                elif relevance_score >= 0.5:
-                    original_result['relevance_category'] = 'medium'
-                elif relevance_score >= 0.2:
-                    original_result['relevance_category'] = 'low'
-                else:
-                    original_result['relevance_category'] = 'minimal'
+                original_result['relevance_category'] = _RELEVANCE_CATEGORIES[bisect_right(_RELEVANCE_BOUNDS, relevance_score)]
                 
                 reranked_results.append(original_result)
                 
@@ -363,50 +344,67 @@ class AdvancedCohereReranker:
             error=error
         )
         
-        self.metrics_history.append(metrics)
+        with self._metrics_lock:
+            # The deque drops its oldest entry when full; take it out of the totals first
+            if len(self.metrics_history) == self.metrics_history.maxlen:
+                self._update_metric_totals(self.metrics_history[0], -1)
+            self.metrics_history.append(metrics)
+            self._update_metric_totals(metrics, 1)
         
-        # Keep only last 1000 metrics to prevent memory issues
-        if len(self.metrics_history) > 1000:
-            self.metrics_history = self.metrics_history[-1000:]
-        
-        logger.debug(f"Stored reranking metrics: success={success}, avg_relevance={avg_relevance:.4f}")
+        logger.debug("Stored reranking metrics: success=%s, avg_relevance=%.4f", success, avg_relevance)
+    
+    def _update_metric_totals(self, metrics: RerankingMetrics, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a successful rerank from the running totals"""
+        if not metrics.success:
+            return
+        
+        self._success_count += sign
+        self._sum_execution_time += sign * metrics.execution_time
+        self._sum_relevance += sign * metrics.avg_relevance_score
+        self._sum_original_count += sign * metrics.original_count
+        self._sum_reranked_count += sign * metrics.reranked_count
+        if metrics.avg_relevance_score > 0.7:
+            self._high_relevance_count += sign
+    
+    def clear_cache(self) -> None:
+        """Drop cached rerank results, e.g. after new documents are ingested"""
+        self._results_cache.clear()
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit, miss and eviction counters for the rerank result cache"""
+        return {'reranks': self._results_cache.stats()}
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get comprehensive performance analytics"""
-        if not self.metrics_history:
-            return {"status": "No metrics available"}
-        
-        successful_reranks = [m for m in self.metrics_history if m.success]
-        
-        if not successful_reranks:
-            return {"status": "No successful reranks"}
-        
-        # Calculate comprehensive metrics
-        total_reranks = len(self.metrics_history)
-        success_rate = len(successful_reranks) / total_reranks * 100
-        
-        avg_execution_time = sum(m.execution_time for m in successful_reranks) / len(successful_reranks)
-        avg_relevance = sum(m.avg_relevance_score for m in successful_reranks) / len(successful_reranks)
-        avg_original_count = sum(m.original_count for m in successful_reranks) / len(successful_reranks)
-        avg_reranked_count = sum(m.reranked_count for m in successful_reranks) / len(successful_reranks)
-        
-        # Recent performance (last 50 reranks)
-        recent_reranks = self.metrics_history[-50:]
-        recent_success_rate = len([m for m in recent_reranks if m.success]) / len(recent_reranks) * 100
-        
-        return {
-            "total_reranking_operations": total_reranks,
-            "success_rate": success_rate,
-            "recent_success_rate": recent_success_rate,
-            "avg_execution_time": avg_execution_time,
-            "avg_relevance_score": avg_relevance,
-            "avg_input_results": avg_original_count,
-            "avg_output_results": avg_reranked_count,
-            "model_used": self.model,
-            "relevance_threshold": self.relevance_threshold,
-            "recent_errors": [m.error for m in self.metrics_history[-10:] if m.error],
-            "high_relevance_queries": len([m for m in successful_reranks if m.avg_relevance_score > 0.7])
-        }
+        with self._metrics_lock:
+            if not self.metrics_history:
+                return {"status": "No metrics available"}
+            
+            successes = self._success_count
+            if not successes:
+                return {"status": "No successful reranks"}
+            
+            # Calculate comprehensive metrics
+            total_reranks = len(self.metrics_history)
+            
+            # Recent performance (last 50 reranks) and recent errors (last 10)
+            recent_reranks = list(islice(reversed(self.metrics_history), 50))
+            recent_success_rate = sum(1 for m in recent_reranks if m.success) / len(recent_reranks) * 100
+            recent_errors = [m.error for m in reversed(recent_reranks[:10]) if m.error]
+            
+            return {
+                "total_reranking_operations": total_reranks,
+                "success_rate": successes / total_reranks * 100,
+                "recent_success_rate": recent_success_rate,
+                "avg_execution_time": self._sum_execution_time / successes,
+                "avg_relevance_score": self._sum_relevance / successes,
+                "avg_input_results": self._sum_original_count / successes,
+                "avg_output_results": self._sum_reranked_count / successes,
+                "model_used": self.model,
+                "relevance_threshold": self.relevance_threshold,
+                "recent_errors": recent_errors,
+                "high_relevance_queries": self._high_relevance_count
+            }
     
     def _generate_results_output(self, query: str, ranked_results: List[Dict[str, Any]]) -> str:
         """Generate Result + Reason format with Cohere and recency-based ranking"""
@@ -420,79 +418,89 @@ class AdvancedCohereReranker:
         # Sort by hybrid score (Cohere + recency weight)
         final_results = sorted(scored_results, key=lambda x: x.get('final_score', 0), reverse=True)
         
-        output = f"🔍 **RESULT:** Found {len(final_results)} relevant mentions about: {query}\n\n"
-        
-        # Add comprehensive reasoning
-        output += f"**REASON:**\n"
-        output += f"• Analyzed {len(ranked_results)} sources using Cohere {self.model}\n"
-        
-        # Cohere relevance analysis
-        high_cohere = [r for r in final_results if r.get('cohere_score', 0) > 0.7]
-        medium_cohere = [r for r in final_results if 0.4 <= r.get('cohere_score', 0) <= 0.7]
-        
-        output += f"• High relevance (>0.7): {len(high_cohere)} sources\n"
-        output += f"• Medium relevance (0.4-0.7): {len(medium_cohere)} sources\n"
-        
-        # Recency analysis
-        recent_30d = [r for r in final_results if r.get('days_ago', 999) <= 30]
-        recent_7d = [r for r in final_results if r.get('days_ago', 999) <= 7]
-        
-        output += f"• Recent mentions (30 days): {len(recent_30d)} sources\n"
-        output += f"• Very recent (7 days): {len(recent_7d)} sources\n"
+        parts = [
+            f"🔍 **RESULT:** Found {len(final_results)} relevant mentions about: {query}\n\n",
+            # Add comprehensive reasoning
+            "**REASON:**\n",
+            f"• Analyzed {len(ranked_results)} sources using Cohere {self.model}\n",
+        ]
+        append = parts.append
+        
+        # Relevance, recency and score totals gathered in a single pass
+        high_cohere = medium_cohere = recent_30d = recent_7d = 0
+        cohere_total = final_total = 0.0
+        
+        for r in final_results:
+            cohere_score = r.get('cohere_score', 0)
+            days_ago = r.get('days_ago', 999)
+            
+            if cohere_score > 0.7:
+                high_cohere += 1
+            elif cohere_score >= 0.4:
+                medium_cohere += 1
+            
+            if days_ago <= 30:
+                recent_30d += 1
+                if days_ago <= 7:
+                    recent_7d += 1
+            
+            cohere_total += cohere_score
+            final_total += r.get('final_score', 0)
         
         # Average scores
-        avg_cohere = sum(r.get('cohere_score', 0) for r in final_results) / len(final_results)
-        avg_final = sum(r.get('final_score', 0) for r in final_results) / len(final_results)
-        
-        output += f"• Average Cohere relevance: {avg_cohere:.3f}\n"
-        output += f"• Average final score: {avg_final:.3f}\n\n"
+        avg_cohere = cohere_total / len(final_results)
+        avg_final = final_total / len(final_results)
+        
+        append(
+            f"• High relevance (>0.7): {high_cohere} sources\n"
+            f"• Medium relevance (0.4-0.7): {medium_cohere} sources\n"
+            f"• Recent mentions (30 days): {recent_30d} sources\n"
+            f"• Very recent (7 days): {recent_7d} sources\n"
+            f"• Average Cohere relevance: {avg_cohere:.3f}\n"
+            f"• Average final score: {avg_final:.3f}\n\n"
+        )
         
         # Top sources with individual reasoning
-        output += "📋 **TOP SOURCES:**\n\n"
+        append("📋 **TOP SOURCES:**\n\n")
         
         for i, result in enumerate(final_results[:5], 1):
             metadata = result.get('metadata', {})
-            
-            output += f"**#{i} - {metadata.get('title', 'No Title')}**\n"
-            output += f"Source: {metadata.get('source_entity_name', 'Unknown')}\n"
-            output += f"Published: {metadata.get('published_at', 'Unknown')}\n"
-            
-            # Individual result reasoning
             cohere_score = result.get('cohere_score', 0)
             days_ago = result.get('days_ago', 999)
             final_score = result.get('final_score', 0)
             
-            output += f"Cohere Relevance: {cohere_score:.3f}\n"
+            append(f"**#{i} - {metadata.get('title', 'No Title')}**\n")
+            append(f"Source: {metadata.get('source_entity_name', 'Unknown')}\n")
+            append(f"Published: {metadata.get('published_at', 'Unknown')}\n")
+            
+            # Individual result reasoning
+            append(f"Cohere Relevance: {cohere_score:.3f}\n")
             if days_ago < 999:
-                output += f"Recency: {days_ago} days ago\n"
-            output += f"Final Score: {final_score:.3f}\n"
+                append(f"Recency: {days_ago} days ago\n")
+            append(f"Final Score: {final_score:.3f}\n")
             
             # Reasoning for this specific result
-            output += f"**Reason Selected:** "
-            if cohere_score > 0.7:
-                output += "High semantic relevance"
-            elif cohere_score > 0.4:
-                output += "Good semantic relevance"
-            else:
-                output += "Moderate relevance"
+            append("**Reason Selected:** ")
+            append(_REASON_LABELS[bisect_left(_REASON_BOUNDS, cohere_score)])
                 
             if days_ago <= 7:
-                output += " + Very recent information"
+                append(" + Very recent information")
             elif days_ago <= 30:
-                output += " + Recent information"
+                append(" + Recent information")
                 
-            output += f"\n\nSnippet: {result.get('text', '')[:200]}...\n"
+            append(f"\n\nSnippet: {result.get('text', '')[:200]}...\n")
             
             url = metadata.get('url', '')
             if url:
-                output += f"URL: {url}\n"
-            output += "\n" + "─" * 50 + "\n\n"
+                append(f"URL: {url}\n")
+            append(_SOURCE_SEPARATOR)
         
-        return output
+        return "".join(parts)
     
     def _calculate_hybrid_scores(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Calculate hybrid scores combining Cohere relevance + recency for optimal accuracy"""
         scored_results = []
+        now = datetime.datetime.now()
         
         for result in results:
             result_copy = result.copy()
@@ -500,11 +508,9 @@ class AdvancedCohereReranker:
             # Get Cohere relevance score (primary factor)
             cohere_score = result.get('cohere_score', 0.0)
             
-            # Calculate recency score from metadata
-            recency_score = self._calculate_recency_score(result.get('metadata', {}))
-            
-            # Calculate days ago for display
-            days_ago = self._extract_days_ago(result.get('metadata', {}))
+            # Parse the publish date once; recency is derived from days ago
+            days_ago = self._extract_days_ago(result.get('metadata', {}), now)
+            recency_score = self._recency_score_from_days(days_ago)
             result_copy['days_ago'] = days_ago
             
             # Hybrid scoring: 70% Cohere relevance + 30% recency
@@ -526,84 +532,25 @@ class AdvancedCohereReranker:
         
         return scored_results
     
-    def _calculate_recency_score(self, metadata: Dict[str, Any]) -> float:
+    def _calculate_recency_score(self, metadata: Dict[str, Any], now: Optional[datetime.datetime] = None) -> float:
         """Calculate recency score with exponential decay for optimal time weighting"""
-        import datetime
-        
-        published_at = metadata.get('published_at', '')
-        if not published_at:
-            return 0.1  # Low score for unknown dates
-        
-        try:
-            # Parse different date formats
-            date_formats = [
-                '%Y-%m-%d',
-                '%Y-%m-%dT%H:%M:%S',
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%d %H:%M:%S'
-            ]
-            
-            published_date = None
-            for fmt in date_formats:
-                try:
-                    published_date = datetime.datetime.strptime(published_at.split('T')[0] if 'T' in published_at else published_at, fmt.split(' ')[0] if ' ' in fmt else fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            if not published_date:
-                return 0.1
-            
-            # Calculate days difference
-            days_ago = (datetime.datetime.now() - published_date).days
-            
-            # Exponential decay scoring: newer = higher score
-            if days_ago <= 1:
-                return 1.0  # Today/yesterday
-            elif days_ago <= 7:
-                return 0.9  # This week
-            elif days_ago <= 30:
-                return 0.7  # This month
-            elif days_ago <= 90:
-                return 0.5  # Last 3 months
-            elif days_ago <= 365:
-                return 0.3  # This year
-            else:
-                return 0.1  # Older than a year
-                
-        except Exception as e:
-            logger.debug(f"Error calculating recency score: {e}")
-            return 0.1
+        return self._recency_score_from_days(self._extract_days_ago(metadata, now))
     
-    def _extract_days_ago(self, metadata: Dict[str, Any]) -> int:
+    def _recency_score_from_days(self, days_ago: int) -> float:
+        """Map days since publication to a recency score"""
+        # Exponential decay scoring: newer = higher score
+        # Unknown dates come through as 999 and land in the lowest bucket
+        return _RECENCY_SCORES[bisect_left(_RECENCY_DAY_BOUNDS, days_ago)]
+    
+    def _extract_days_ago(self, metadata: Dict[str, Any], now: Optional[datetime.datetime] = None) -> int:
         """Extract days ago for display purposes"""
-        import datetime
-        
         published_at = metadata.get('published_at', '')
         if not published_at:
             return 999  # Unknown date indicator
         
-        try:
-            date_formats = [
-                '%Y-%m-%d',
-                '%Y-%m-%dT%H:%M:%S',
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%d %H:%M:%S'
-            ]
-            
-            published_date = None
-            for fmt in date_formats:
-                try:
-                    published_date = datetime.datetime.strptime(published_at.split('T')[0] if 'T' in published_at else published_at, fmt.split(' ')[0] if ' ' in fmt else fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            if published_date:
-                return (datetime.datetime.now() - published_date).days
-            
-        except Exception:
-            pass
+        published_date = parse_naive_datetime(published_at)
+        if published_date is not None:
+            return ((now or datetime.datetime.now()) - published_date).days
         
         return 999
 
@@ -614,11 +561,58 @@ class AdvancedCohereReranker:
             logger.warning("No results provided for reranking")
             return []
         
+        key = self._rerank_key(query, results, top_k)
+        cached = self._results_cache.get(key)
+        if cached is not None:
+            logger.info(f"Rerank cache hit for query='{query[:50]}...'")
+            return self._copy_results(cached)
+        
+        # Coalesce identical concurrent requests onto a single Cohere call
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = Future()
+                self._inflight[key] = pending
+        
+        if not is_owner:
+            logger.info(f"Joining in-flight rerank for query='{query[:50]}...'")
+            return self._copy_results(pending.result())
+        
+        try:
+            reranked_results = self._rerank_with_retries(query, results, top_k, cache_key=key)
+            pending.set_result(reranked_results)
+            return self._copy_results(reranked_results)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def _copy_results(self, results: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copy shared result rows (and their metadata) so callers can annotate them without touching the cache"""
+        return [{**result, 'metadata': dict(result.get('metadata', {}))} for result in results]
+    
+    def _rerank_key(self, query: str, results: List[Dict[str, Any]], top_k: int) -> Hashable:
+        """Identify a rerank request by query, candidate identities and top_k"""
+        # Cohere scores each document independently, so the same candidates in a different
+        # order (e.g. related searches finishing in another order) are the same request
+        doc_keys = frozenset(
+            r.get('id') or r.get('metadata', {}).get('url') or r.get('text', '')
+            for r in results
+        )
+        return (query, top_k, doc_keys)
+    
+    def _rerank_with_retries(self, query: str, results: List[Dict[str, Any]], top_k: int,
+                             cache_key: Optional[Hashable] = None) -> List[Dict[str, Any]]:
+        """Call Cohere with retries, then apply hybrid scoring or the recency fallback"""
+        
         if not query or not query.strip():
             logger.error("Empty query provided for reranking")
-            return results[:top_k]
+            return self._mark_fallback(results[:top_k])
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Apply retry logic for Cohere API
         max_retries = self.max_retries
@@ -633,7 +627,7 @@ class AdvancedCohereReranker:
                 
                 if not documents:
                     logger.warning("No valid documents after preparation")
-                    return results[:top_k]
+                    return self._mark_fallback(results[:top_k])
                 
                 # Get Cohere reranking
                 response = self._call_cohere_api(query, documents, top_k)
@@ -648,10 +642,14 @@ class AdvancedCohereReranker:
                 final_results = sorted(scored_results, key=lambda x: x.get('final_score', 0), reverse=True)[:top_k]
                 
                 # Store metrics
-                execution_time = time.time() - start_time
+                execution_time = time.perf_counter() - start_time
                 self._store_metrics(query, len(results), len(final_results), final_results, execution_time, True)
                 
                 logger.info(f"Enhanced reranking completed: {len(final_results)} results in {execution_time:.3f}s")
+                
+                # Only real Cohere rankings are cached; fallbacks should retry on the next request
+                if cache_key is not None:
+                    self._results_cache.set(cache_key, tuple(final_results))
                 return final_results
                 
             except cohere.errors.CohereAPIError as e:
@@ -659,8 +657,8 @@ class AdvancedCohereReranker:
                 logger.warning(f"Cohere API error (attempt {attempt + 1}/{max_retries}): {e}")
                 
                 if attempt < max_retries - 1:
-                    wait_time = self.retry_delay * (2 ** attempt)
-                    logger.info(f"Retrying in {wait_time}s...")
+                    wait_time = self._backoff_delay(attempt)
+                    logger.info(f"Retrying in {wait_time:.2f}s...")
                     time.sleep(wait_time)
             except Exception as e:
                 last_exception = e
@@ -668,7 +666,7 @@ class AdvancedCohereReranker:
                 break
         
         # Fallback with basic recency sorting
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         logger.error(f"Reranking failed, using recency fallback: {last_exception}")
         
         # Store error metrics
@@ -678,15 +676,30 @@ class AdvancedCohereReranker:
         fallback_results = self._fallback_recency_sort(results)
         return fallback_results[:top_k]
     
+    def _mark_fallback(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copy results that Cohere never ranked, flagged so callers know not to cache them"""
+        return [{**result, 'rerank_fallback': True} for result in results]
+    
     def _fallback_recency_sort(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Fallback sorting by recency when Cohere fails"""
+        """Fallback sorting by vector similarity and recency when Cohere fails"""
         scored_results = []
+        now = datetime.datetime.now()
         
         for result in results:
             result_copy = result.copy()
-            recency_score = self._calculate_recency_score(result.get('metadata', {}))
+            # Same days-ago derivation as the hybrid score, so callers see real ages here too
+            days_ago = self._extract_days_ago(result.get('metadata', {}), now)
+            recency_score = self._recency_score_from_days(days_ago)
+            result_copy['days_ago'] = days_ago
             result_copy['recency_score'] = recency_score
-            result_copy['final_score'] = recency_score  # Use recency as final score
+            result_copy['rerank_fallback'] = True
+            
+            # Blend in the vector store's similarity when available, same weights as the hybrid score
+            vector_score = result.get('score')
+            if vector_score is not None:
+                result_copy['final_score'] = (vector_score * 0.7) + (recency_score * 0.3)
+            else:
+                result_copy['final_score'] = recency_score  # Use recency as final score
             scored_results.append(result_copy)
         
         return sorted(scored_results, key=lambda x: x.get('final_score', 0), reverse=True)
@@ -1,10 +1,15 @@
 from turbopuffer import Turbopuffer
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import openai
 from config import Config
+from cache import TTLCache
 import json
 from data_processor import ProcessedMention  # Add this import
 
+# Result text is cut here: the prompt uses at most 300 characters and the reranker
+# doesn't need whole chunks, so longer bodies only inflate memory and the Cohere payload
+RESULT_TEXT_CHARS = 512
+
 class VectorStore:
     def __init__(self):
         config = Config()
@@ -14,6 +19,10 @@ class VectorStore:
         )
         self.namespace = "hyperliquid-mentions"
         self.openai_client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
+        # Query embeddings are deterministic, so repeated queries skip the embedding call
+        self._query_embeddings = TTLCache(max_items=1024, ttl_sec=None)
+        # Recent search rows per normalized (query, top_k); cleared whenever new chunks are stored
+        self._search_results = TTLCache(max_items=512, ttl_sec=300)
         
     def store_chunks(self, chunks: List[Dict[str, Any]]):
         """Store chunks in Turbopuffer"""
@@ -49,15 +58,34 @@ class VectorStore:
             
             print(f"✅ Successfully stored {len(upsert_rows)} chunks in Turbopuffer")
             
+            # New chunks can change any ranking, so cached search rows are stale
+            self.clear_search_cache()
+            
         except Exception as e:
             print(f"❌ Error storing chunks: {e}")
             raise
     
+    def clear_search_cache(self) -> None:
+        """Drop cached search rows so the next searches see newly stored chunks"""
+        self._search_results.clear()
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit, miss and eviction counters for the search-row and query-embedding caches"""
+        return {
+            'search_rows': self._search_results.stats(),
+            'query_embeddings': self._query_embeddings.stats(),
+        }
+    
     def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
         """Search for similar chunks using vector similarity"""
+        cache_key = (" ".join(query.lower().split()), top_k)
+        cached = self._search_results.get(cache_key)
+        if cached is not None:
+            return self._copy_rows(cached)
+        
         try:
             # Simple single query approach for now
-            query_embedding = self._generate_embeddings([query])[0]
+            query_embedding = self._embed_query(query)
             
             # Search in Turbopuffer using the correct API
             namespace = self.client.namespace(self.namespace)
@@ -70,30 +98,18 @@ class VectorStore:
             )
             
             # Convert Row objects to dictionaries
-            converted_results = []
-            for row in results.rows:
-                result_dict = {
-                    'id': getattr(row, 'id', None),
-                    'text': getattr(row, 'text', ''),
-                    'metadata': {
-                        'title': getattr(row, 'title', None),
-                        'summary': getattr(row, 'summary', None),
-                        'url': getattr(row, 'url', None),
-                        'published_at': getattr(row, 'published_at', None),
-                        'channel_name': getattr(row, 'channel_name', None),
-                        'channel_type': getattr(row, 'channel_type', None),
-                        'source_entity_name': getattr(row, 'source_entity_name', None),
-                        'hyperliquid_tokens': getattr(row, 'hyperliquid_tokens', None)
-                    }
-                }
-                converted_results.append(result_dict)
-            
-            return converted_results
+            rows = tuple(self._row_to_result(row) for row in results.rows)
+            self._search_results.set(cache_key, rows)
+            return self._copy_rows(rows)
             
         except Exception as e:
             print(f"❌ Search error: {e}")
             return []
     
+    def _copy_rows(self, rows: Tuple[Dict[str, Any], ...]) -> List[Dict[str, Any]]:
+        """Copy cached rows (and their metadata) so callers can annotate them without touching the cache"""
+        return [{**row, 'metadata': dict(row['metadata'])} for row in rows]
+    
     def search_with_filters(self, query: str, filters: Dict = None, top_k: int = 10):
         """Search with optional metadata filters"""
         base_filters = []
@@ -110,7 +126,7 @@ class VectorStore:
                 base_filters.append(('hyperliquid_tokens', 'contains', filters['tokens']))
         
         try:
-            query_embedding = self._generate_embeddings([query])[0]
+            query_embedding = self._embed_query(query)
             
             namespace = self.client.namespace(self.namespace)
             
@@ -121,31 +137,62 @@ class VectorStore:
                 include_attributes=True
             )
             
-            # Convert Row objects to dictionaries (same as in search method)
-            converted_results = []
-            for row in results.rows:
-                result_dict = {
-                    'id': getattr(row, 'id', None),
-                    'text': getattr(row, 'text', ''),
-                    'metadata': {
-                        'title': getattr(row, 'title', None),
-                        'summary': getattr(row, 'summary', None),
-                        'url': getattr(row, 'url', None),
-                        'published_at': getattr(row, 'published_at', None),
-                        'channel_name': getattr(row, 'channel_name', None),
-                        'channel_type': getattr(row, 'channel_type', None),
-                        'source_entity_name': getattr(row, 'source_entity_name', None),
-                        'hyperliquid_tokens': getattr(row, 'hyperliquid_tokens', None)
-                    }
-                }
-                converted_results.append(result_dict)
-            
-            return converted_results
+            # Convert Row objects to dictionaries
+            return [self._row_to_result(row) for row in results.rows]
         
         except Exception as e:
             print(f"❌ Filtered search error: {e}")
             return []
     
+    def _row_to_result(self, row: Any) -> Dict[str, Any]:
+        """Convert a Turbopuffer row into a result dictionary"""
+        result_dict = {
+            'id': getattr(row, 'id', None),
+            'text': (getattr(row, 'text', '') or '')[:RESULT_TEXT_CHARS],
+            'metadata': {
+                'title': getattr(row, 'title', None),
+                'summary': getattr(row, 'summary', None),
+                'url': getattr(row, 'url', None),
+                'published_at': getattr(row, 'published_at', None),
+                'channel_name': getattr(row, 'channel_name', None),
+                'channel_type': getattr(row, 'channel_type', None),
+                'source_entity_name': getattr(row, 'source_entity_name', None),
+                'hyperliquid_tokens': getattr(row, 'hyperliquid_tokens', None)
+            }
+        }
+        
+        # Cosine similarity from the ANN distance, used to rank without Cohere
+        distance = getattr(row, '$dist', getattr(row, 'dist', None))
+        if distance is not None:
+            result_dict['score'] = 1.0 - float(distance)
+        
+        return result_dict
+    
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a search query, reusing the cached embedding for repeated queries"""
+        embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            embedding = self._generate_embeddings([query])[0]
+            # Don't cache the zero-vector fallback from a failed embedding call
+            if any(embedding):
+                self._query_embeddings.set(query, embedding)
+        return embedding
+    
+    def _embed_queries(self, queries: List[str]) -> None:
+        """Embed every query not already cached in a single OpenAI call"""
+        missing = [q for q in dict.fromkeys(queries) if self._query_embeddings.get(q) is None]
+        if not missing:
+            return
+        
+        for query, embedding in zip(missing, self._generate_embeddings(missing)):
+            if any(embedding):
+                self._query_embeddings.set(query, embedding)
+    
+    def batch_search(self, queries: List[str], top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """Search several queries, embedding all of them in one round-trip"""
+        self._embed_queries(queries)
+        return [self.search(query, top_k=top_k) for query in queries]
+    
     def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using OpenAI's text-embedding-3-large"""
         embeddings = []